@@ -1,25 +1,77 @@
 from Model.product_class import Product
-from typing import List
+from typing import Dict, List, Optional, Set
 
 class Inventory:
-    def __init__(self, inventoryId: int):
+    def __init__(self, inventoryId: int, lowStockThreshold: int = 10):
         self.inventoryId = inventoryId
-        self.products: List[Product] = []
+        self.lowStockThreshold = lowStockThreshold
+        self.products: Dict[int, Product] = {}
+        self.totalUnits = 0
+        self._stockLevels: Dict[int, int] = {}
+        self._supplierOf: Dict[int, Optional[str]] = {}
+        self._bySupplier: Dict[Optional[str], Set[int]] = {}
+        self._lowStock: Set[int] = set()
 
     def addProduct(self, product: Product):
-        self.products.append(product)
+        if product.productId in self.products:
+            self.removeProduct(product.productId)
+
+        self.products[product.productId] = product
+        self._index(product)
 
     def removeProduct(self, productId: int):
-        new_products = []
-        
-        for p in self.products:
-            if p.productId != productId:
-                new_products.append(p)
-        
-        self.products = new_products
+        product = self.products.pop(productId, None)
+        if product is None:
+            return
+
+        self._unindex(productId)
+
+    def getProduct(self, productId: int) -> Optional[Product]:
+        return self.products.get(productId)
 
     def checkStock(self, productId: int):
-        for product in self.products:
-            if product.productId == productId:
-                return product.stockQuantity
-        return 0
+        product = self.products.get(productId)
+        return product.stockQuantity if product else 0
+
+    def unitsOf(self, productId: int) -> int:
+        return self._stockLevels.get(productId, 0)
+
+    def updateStock(self, productId: int, quantity: int):
+        product = self.products.get(productId)
+        if product is None:
+            return
+
+        product.updateStock(quantity)
+        self.refreshProduct(productId)
+
+    def refreshProduct(self, productId: int):
+        product = self.products.get(productId)
+        if product is None:
+            return
+
+        self._unindex(productId)
+        self._index(product)
+
+    def getProductsBySupplier(self, supplierName: str) -> List[Product]:
+        return [self.products[pid] for pid in self._bySupplier.get(supplierName, ())]
+
+    def getLowStockProducts(self) -> List[Product]:
+        return [self.products[pid] for pid in self._lowStock]
+
+    def _index(self, product: Product):
+        productId = product.productId
+        self._stockLevels[productId] = product.stockQuantity
+        self._supplierOf[productId] = product.supplierName
+        self._bySupplier.setdefault(product.supplierName, set()).add(productId)
+        if product.stockQuantity <= self.lowStockThreshold:
+            self._lowStock.add(productId)
+        self.totalUnits += product.stockQuantity
+
+    def _unindex(self, productId: int):
+        self.totalUnits -= self._stockLevels.pop(productId)
+        supplierName = self._supplierOf.pop(productId)
+        supplierProducts = self._bySupplier[supplierName]
+        supplierProducts.discard(productId)
+        if not supplierProducts:
+            del self._bySupplier[supplierName]
+        self._lowStock.discard(productId)
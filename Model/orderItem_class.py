@@ -1,6 +1,8 @@
 from Model.product_class import Product
 
 class OrderItem:
+    __slots__ = ('product', 'quantity', 'price')
+
     def __init__(self, product: Product, quantity: int):
         self.product = product
         self.quantity = quantity
@@ -3,6 +3,8 @@ from typing import List
 from Model.orderItem_class import OrderItem
 
 class Order:
+    __slots__ = ('orderId', 'orderDate', 'status', 'items', 'totalAmount')
+
     def __init__(self, orderId: int, orderDate: date, status: str, items: List[OrderItem]):
         self.orderId = orderId
         self.orderDate = orderDate
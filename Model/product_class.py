@@ -1,4 +1,6 @@
 class Product:
+    __slots__ = ('productId', 'name', 'description', 'price', 'stockQuantity', 'supplierName')
+
     def __init__(self, productId: int, name: str, description: str, price: float, 
                  stockQuantity: int, supplierName: str = None):
         self.productId = productId
@@ -2,6 +2,8 @@ from datetime import date
 from Model.order_class import Order
 
 class Shipment:
+    __slots__ = ('shipmentId', 'order', 'shipmentDate', 'status')
+
     def __init__(self, shipmentId: int, order: Order, shipmentDate: 'date', status: str):
         self.shipmentId = shipmentId
         self.order = order
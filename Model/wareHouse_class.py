@@ -8,13 +8,19 @@ class Warehouse:
         self.capacity = capacity
         self.inventory = Inventory(inventoryId=warehouseId)
 
+    def availableCapacity(self) -> int:
+        return self.capacity - self.inventory.totalUnits
+
     def addProduct(self, product: Product):
+        current = self.inventory.unitsOf(product.productId)
+        if product.stockQuantity - current > self.availableCapacity():
+            raise ValueError(f"Warehouse {self.warehouseId} capacity exceeded. Available: {self.availableCapacity()}")
         self.inventory.addProduct(product)
 
     def removeProduct(self, productId: int):
         self.inventory.removeProduct(productId)
 
     def updateStock(self, productId: int, quantity: int):
-        for product in self.inventory.products:
-            if product.productId == productId:
-                product.updateStock(quantity)
+        if quantity > self.availableCapacity():
+            raise ValueError(f"Warehouse {self.warehouseId} capacity exceeded. Available: {self.availableCapacity()}")
+        self.inventory.updateStock(productId, quantity)
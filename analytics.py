@@ -0,0 +1,253 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from database import Database
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 500_000
+
+EPOCH_DAY = "CAST(julianday(substr({}, 1, 10)) - 2440587.5 AS INTEGER)"
+
+LINE_ITEM_COLUMNS = {
+    'day': (EPOCH_DAY.format('o.orderDate'), 'int64'),
+    'orderId': ('oi.orderId', 'int64'),
+    'productId': ('oi.productId', 'int64'),
+    'quantity': ('oi.quantity', 'int64'),
+    'revenue': ('oi.price', 'float64'),
+}
+
+def require_numpy():
+    if np is None:
+        raise ImportError("Analytics needs numpy. Install it with 'pip install numpy'")
+
+def _order_filters(start_date: Optional[str], end_date: Optional[str],
+                   statuses: Optional[List[str]]) -> Tuple[List[str], List[Any]]:
+    conditions = []
+    params = []
+    if start_date is not None:
+        conditions.append('o.orderDate >= ?')
+        params.append(str(start_date))
+    if end_date is not None:
+        conditions.append('o.orderDate <= ?')
+        params.append(str(end_date))
+    if statuses is None:
+        conditions.append("o.status != 'Cancelled'")
+    else:
+        conditions.append(f"o.status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    return conditions, params
+
+def where_clause(conditions: List[str]) -> str:
+    return 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+
+def fetch_chunks(db: Database, query: str, params: List[Any], chunk_size: int) -> Iterator[List[Tuple]]:
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+
+def to_columns(rows: List[Tuple], dtypes: List[str]) -> List[Any]:
+    return [np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes)]
+
+def iter_line_items(db: Database, fields: Tuple[str, ...] = tuple(LINE_ITEM_COLUMNS),
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    statuses: Optional[List[str]] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    require_numpy()
+    conditions, params = _order_filters(start_date, end_date, statuses)
+    query = f'''
+    SELECT {', '.join(LINE_ITEM_COLUMNS[field][0] for field in fields)}
+    FROM order_items oi
+    JOIN orders o ON oi.orderId = o.orderId
+    {where_clause(conditions)}
+    '''
+    for rows in fetch_chunks(db, query, params, chunk_size):
+        yield dict(zip(fields, to_columns(rows, [LINE_ITEM_COLUMNS[field][1] for field in fields])))
+
+def iter_supply(db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    require_numpy()
+    conditions = []
+    params = []
+    if start_date is not None:
+        conditions.append('supplyDate >= ?')
+        params.append(str(start_date))
+    if end_date is not None:
+        conditions.append('supplyDate <= ?')
+        params.append(str(end_date))
+    query = f'''
+    SELECT {EPOCH_DAY.format('supplyDate')}, productId, quantity, supplierId
+    FROM supply_records
+    {where_clause(conditions)}
+    '''
+    for rows in fetch_chunks(db, query, params, chunk_size):
+        day, product_id, quantity, supplier_id = to_columns(rows, ['int64', 'int64', 'int64', 'int64'])
+        yield {'day': day, 'productId': product_id, 'quantity': quantity, 'supplierId': supplier_id}
+
+def max_product_id(db: Database) -> int:
+    with db.connection() as conn:
+        return conn.execute('SELECT COALESCE(MAX(productId), 0) FROM products').fetchone()[0]
+
+def supplier_names(db: Database) -> Dict[int, str]:
+    with db.connection() as conn:
+        return dict(tuple(row) for row in conn.execute('SELECT supplierId, name FROM suppliers'))
+
+def _grow(totals: Any, size: int) -> Any:
+    if size <= len(totals):
+        return totals
+    return np.concatenate([totals, np.zeros(size - len(totals), dtype=totals.dtype)])
+
+def _per_product(chunks: Iterator[Dict[str, Any]], size: int, *fields: str) -> List[Any]:
+    totals = [np.zeros(size, dtype='float64') for _ in fields]
+    for chunk in chunks:
+        needed = int(chunk['productId'].max()) + 1
+        for position, field in enumerate(fields):
+            totals[position] = _grow(totals[position], needed)
+            totals[position] += np.bincount(chunk['productId'], weights=chunk[field], minlength=len(totals[position]))
+    return totals
+
+def revenue(db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None,
+            statuses: Optional[List[str]] = None, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    total = 0.0
+    units = 0
+    lines = 0
+    order_ids = []
+    for chunk in iter_line_items(db, ('orderId', 'quantity', 'revenue'), start_date, end_date, statuses, chunk_size):
+        total += float(chunk['revenue'].sum())
+        units += int(chunk['quantity'].sum())
+        lines += len(chunk['orderId'])
+        order_ids.append(np.unique(chunk['orderId']))
+    orders = len(np.unique(np.concatenate(order_ids))) if order_ids else 0
+    return {'orderCount': orders, 'lineItems': lines, 'unitsSold': units, 'revenue': total}
+
+def top_products(db: Database, limit: int = 10, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 statuses: Optional[List[str]] = None, by: str = 'revenue',
+                 chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    if by not in ('revenue', 'quantity'):
+        raise ValueError("Rank products by 'revenue' or 'quantity'")
+    units, sales = _per_product(iter_line_items(db, ('productId', 'quantity', 'revenue'), start_date, end_date,
+                                                statuses, chunk_size),
+                                max_product_id(db) + 1, 'quantity', 'revenue')
+    ranking = sales if by == 'revenue' else units
+    sold = np.flatnonzero(units)
+    if limit < len(sold):
+        sold = sold[np.argpartition(-ranking[sold], limit)[:limit]]
+    sold = sold[np.argsort(-ranking[sold], kind='stable')]
+    return [{'productId': int(product_id), 'unitsSold': int(units[product_id]), 'revenue': float(sales[product_id])}
+            for product_id in sold]
+
+def units_per_day(db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  statuses: Optional[List[str]] = None, product_id: Optional[int] = None,
+                  chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    first = None
+    units = np.zeros(0, dtype='int64')
+    sales = np.zeros(0, dtype='float64')
+    fields = ('day', 'quantity', 'revenue') + (('productId',) if product_id is not None else ())
+    for chunk in iter_line_items(db, fields, start_date, end_date, statuses, chunk_size):
+        if product_id is not None:
+            keep = chunk['productId'] == product_id
+            chunk = {field: values[keep] for field, values in chunk.items()}
+            if not len(chunk['day']):
+                continue
+        chunk_first = chunk['day'].min()
+        if first is None or chunk_first < first:
+            shift = 0 if first is None else int(first - chunk_first)
+            units = np.concatenate([np.zeros(shift, dtype='int64'), units])
+            sales = np.concatenate([np.zeros(shift, dtype='float64'), sales])
+            first = chunk_first
+        offsets = chunk['day'] - first
+        size = int(offsets.max()) + 1
+        units = _grow(units, size)
+        sales = _grow(sales, size)
+        units += np.bincount(offsets, weights=chunk['quantity'], minlength=len(units)).astype('int64')
+        sales += np.bincount(offsets, weights=chunk['revenue'], minlength=len(sales))
+
+    if first is None:
+        return []
+    return [{'day': str(np.datetime64(int(first + offset), 'D')), 'unitsSold': int(units[offset]),
+             'revenue': float(sales[offset])}
+            for offset in np.flatnonzero(units)]
+
+def stock_turnover(db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   statuses: Optional[List[str]] = None, limit: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    size = max_product_id(db) + 1
+    sold, = _per_product(iter_line_items(db, ('productId', 'quantity'), start_date, end_date, statuses, chunk_size),
+                         size, 'quantity')
+    supplied, = _per_product(iter_supply(db, start_date, end_date, chunk_size), size, 'quantity')
+    size = max(len(sold), len(supplied), size)
+    sold, supplied = _grow(sold, size), _grow(supplied, size)
+
+    stock = np.zeros(size, dtype='float64')
+    for rows in fetch_chunks(db, 'SELECT productId, stockQuantity FROM products', [], chunk_size):
+        product_id, quantity = to_columns(rows, ['int64', 'float64'])
+        stock[product_id] = quantity
+
+    opening = np.maximum(stock + sold - supplied, 0)
+    average = (opening + stock) / 2
+    active = np.flatnonzero((sold > 0) & (average > 0))
+    turnover = sold[active] / average[active]
+    order = np.argsort(-turnover, kind='stable')
+    if limit is not None:
+        order = order[:limit]
+    return [{'productId': int(active[position]), 'unitsSold': int(sold[active[position]]),
+             'averageStock': float(average[active[position]]), 'turnover': float(turnover[position])}
+            for position in order]
+
+def supplier_volume(db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    quantities = np.zeros(0, dtype='int64')
+    records = np.zeros(0, dtype='int64')
+    for chunk in iter_supply(db, start_date, end_date, chunk_size):
+        size = int(chunk['supplierId'].max()) + 1
+        quantities = _grow(quantities, size)
+        records = _grow(records, size)
+        quantities += np.bincount(chunk['supplierId'], weights=chunk['quantity'],
+                                  minlength=len(quantities)).astype('int64')
+        records += np.bincount(chunk['supplierId'], minlength=len(records))
+    names = supplier_names(db)
+    return sorted(({'supplierName': names.get(int(supplier_id)), 'recordCount': int(records[supplier_id]),
+                    'quantity': int(quantities[supplier_id])} for supplier_id in np.flatnonzero(records)),
+                  key=lambda row: (-row['quantity'], row['supplierName'] or ''))
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized sales and supply analytics (requires numpy)")
+    parser.add_argument("analysis", choices=["revenue", "top-products", "units-per-day", "turnover", "suppliers"])
+    parser.add_argument("--db", default="warehouse.db")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--status", action="append", help="Order statuses to include (default: all but Cancelled)")
+    parser.add_argument("--product-id", type=int)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--by", choices=["revenue", "quantity"], default="revenue")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.analysis == "revenue":
+            result = revenue(db, args.start_date, args.end_date, args.status, args.chunk_size)
+        elif args.analysis == "top-products":
+            result = top_products(db, args.limit, args.start_date, args.end_date, args.status, args.by, args.chunk_size)
+        elif args.analysis == "units-per-day":
+            result = units_per_day(db, args.start_date, args.end_date, args.status, args.product_id, args.chunk_size)
+        elif args.analysis == "turnover":
+            result = stock_turnover(db, args.start_date, args.end_date, args.status, args.limit, args.chunk_size)
+        else:
+            result = supplier_volume(db, args.start_date, args.end_date, args.chunk_size)
+    finally:
+        db.close()
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable
+from database import Database
+
+_STOP = object()
+
+CHUNKED_WRITES = {'expire_pending_orders'}
+
+SNAPSHOT_CALLS = {'enable_snapshots', 'refresh_snapshot'}
+
+class AsyncDatabase:
+    def __init__(self, db_name: str = "warehouse.db", readers: int = 4, max_pending_writes: int = 1000,
+                 page_size: int = 500):
+        if max_pending_writes <= 0:
+            raise ValueError("max_pending_writes must be positive")
+        self.db = Database(db_name, pooled=True, readers=readers)
+        self.page_size = page_size
+        self._read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self._writes = queue.Queue()
+        self._write_slots = asyncio.Semaphore(max_pending_writes)
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+        self._closed = False
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.db, name)
+        access = getattr(getattr(Database, name, None), 'access', None)
+        if access == 'write' or name in CHUNKED_WRITES:
+            return functools.partial(self._write, method)
+        if access == 'read' or name in SNAPSHOT_CALLS:
+            return functools.partial(self._read, method)
+        if name.startswith('iter_'):
+            return functools.partial(self._iterate, method)
+        return method
+
+    @property
+    def pending_writes(self) -> int:
+        return self._writes.qsize()
+
+    async def _read(self, method: Callable, *args, **kwargs) -> Any:
+        if self._closed:
+            raise RuntimeError("AsyncDatabase is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, functools.partial(method, *args, **kwargs))
+
+    async def _write(self, method: Callable, *args, **kwargs) -> Any:
+        if self._closed:
+            raise RuntimeError("AsyncDatabase is closed")
+        async with self._write_slots:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._writes.put((loop, future, method, args, kwargs))
+            return await future
+
+    async def _iterate(self, method: Callable, *args, **kwargs) -> AsyncIterator[Any]:
+        rows = method(*args, **kwargs)
+        while True:
+            page = await self._read(lambda: list(itertools.islice(rows, self.page_size)))
+            for row in page:
+                yield row
+            if len(page) < self.page_size:
+                return
+
+    def _write_loop(self):
+        while True:
+            job = self._writes.get()
+            if job is _STOP:
+                return
+            loop, future, method, args, kwargs = job
+            try:
+                result = method(*args, **kwargs)
+            except BaseException as e:
+                loop.call_soon_threadsafe(self._resolve, future, None, e)
+            else:
+                loop.call_soon_threadsafe(self._resolve, future, result, None)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any, error: BaseException):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        self._read_executor.shutdown(wait=True)
+        self.db.close()
+
+    async def __aenter__(self) -> 'AsyncDatabase':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+from database import Database
+from benchmarks.fixtures import SIZES, generate
+
+LISTING_REPEATS = 3
+
+# Cases that need snapshot reads switched on; every other case runs against the live database.
+SNAPSHOT_CASES = {'refresh_snapshot'}
+
+class Context:
+    def __init__(self, db: Database, seed: int):
+        self.rng = random.Random(seed)
+        self.max_product = db.conn.execute('SELECT MAX(productId) FROM products').fetchone()[0]
+        self.max_order = db.get_max_order_id()
+        self.max_shipment = db.get_max_shipment_id()
+        self.max_supplier = db.get_max_supplier_id()
+        self.next_product = self.max_product + 1
+        self.next_order = self.max_order + 1
+        self.next_shipment = self.max_shipment + 1
+        self.next_supplier = db.reserve_ids('suppliers', 100_000).start
+        self.open_orders = [row[0] for row in db.conn.execute(
+            "SELECT orderId FROM orders WHERE status IN ('Pending', 'Placed') LIMIT 100000")]
+
+    def product(self) -> int:
+        return self.rng.randint(1, self.max_product)
+
+    def order(self) -> int:
+        return self.rng.randint(1, self.max_order)
+
+    def shipment(self) -> int:
+        return self.rng.randint(1, self.max_shipment)
+
+    def new_product_id(self) -> int:
+        self.next_product += 1
+        return self.next_product - 1
+
+    def new_order_id(self) -> int:
+        self.next_order += 1
+        return self.next_order - 1
+
+    def new_shipment_id(self) -> int:
+        self.next_shipment += 1
+        return self.next_shipment - 1
+
+    def new_supplier_id(self) -> int:
+        self.next_supplier += 1
+        return self.next_supplier - 1
+
+    def new_product(self) -> Dict[str, Any]:
+        return {'productId': self.new_product_id(), 'name': "Bench product", 'description': "Benchmark",
+                'price': 9.99, 'stockQuantity': 1_000_000}
+
+    def new_supplier(self) -> Dict[str, Any]:
+        supplier_id = self.new_supplier_id()
+        return {'supplierId': supplier_id, 'name': f"Bench supplier {supplier_id}", 'contact': "bench@example.com"}
+
+    def new_supply_record(self) -> Dict[str, Any]:
+        return {'product_id': self.product(), 'quantity': 10, 'supplier_name': "Bench supplier",
+                'supply_date': str(date.today())}
+
+    def shipments(self, count: int) -> List[int]:
+        return self.rng.sample(range(1, self.max_shipment + 1), min(count, self.max_shipment))
+
+    def new_order(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        items = [{'productId': self.product(), 'quantity': 1, 'price': 9.99}
+                 for _ in range(self.rng.randint(1, 4))]
+        order = {'orderId': self.new_order_id(), 'orderDate': str(date.today()),
+                 'status': "Pending", 'totalAmount': sum(item['price'] for item in items)}
+        return order, items
+
+def _consume(result: Any) -> Any:
+    if hasattr(result, '__next__'):
+        for _ in result:
+            pass
+    return result
+
+def _cancel_open_order(db: Database, ctx: Context):
+    if ctx.open_orders:
+        db.cancel_order(ctx.open_orders.pop(), update_memory=True)
+
+def _cancel_open_orders(db: Database, ctx: Context):
+    batch = ctx.open_orders[-100:]
+    del ctx.open_orders[-100:]
+    db.cancel_orders(batch)
+
+def _remove_product(db: Database, ctx: Context):
+    product_id = ctx.new_product_id()
+    db.add_product({'productId': product_id, 'name': "Doomed", 'description': "",
+                    'price': 1.0, 'stockQuantity': 0})
+    db.remove_product(product_id)
+
+CASES: Dict[str, Tuple[Callable[[Database, Context], Any], bool]] = {
+    'add_product': (lambda db, ctx: db.add_product(ctx.new_product()), False),
+    'add_products_100': (lambda db, ctx: db.add_products([ctx.new_product() for _ in range(100)]), False),
+    'add_supplier': (lambda db, ctx: db.add_supplier(ctx.new_supplier()), False),
+    'add_suppliers_100': (lambda db, ctx: db.add_suppliers([ctx.new_supplier() for _ in range(100)]), False),
+    'upsert_supplier': (lambda db, ctx: db.upsert_supplier(f"Supplier {ctx.rng.randint(1, 10)}"), False),
+    'add_order': (lambda db, ctx: db.add_order(*ctx.new_order()), False),
+    'add_orders_100': (lambda db, ctx: db.add_orders([ctx.new_order() for _ in range(100)]), False),
+    'add_orders_100_history': (lambda db, ctx: db.add_orders([ctx.new_order() for _ in range(100)],
+                                                             reserve_stock=False), False),
+    'place_order': (lambda db, ctx: db.place_order(*ctx.new_order()), False),
+    'add_shipment': (lambda db, ctx: db.add_shipment({
+        'shipmentId': ctx.new_shipment_id(), 'orderId': ctx.order(),
+        'shipmentDate': str(date.today()), 'status': "Shipped"}), False),
+    'add_supply_record': (lambda db, ctx: db.add_supply_record(ctx.new_supply_record()), False),
+    'add_supply_records_100': (lambda db, ctx: db.add_supply_records(
+        [ctx.new_supply_record() for _ in range(100)]), False),
+    'update_product_stock': (lambda db, ctx: db.update_product_stock(ctx.product(), 1), False),
+    'update_order_status': (lambda db, ctx: db.update_order_status(ctx.order(), "Placed"), False),
+    'update_shipment_status': (lambda db, ctx: db.update_shipment_status(ctx.shipment(), "Shipped"), False),
+    'update_shipment_statuses_100': (lambda db, ctx: db.update_shipment_statuses(
+        [(shipment_id, "Delivered") for shipment_id in ctx.shipments(100)]), False),
+    'cancel_order': (_cancel_open_order, False),
+    'cancel_orders_100': (_cancel_open_orders, False),
+    'expire_pending_orders': (lambda db, ctx: db.expire_pending_orders(365), True),
+    'remove_product': (_remove_product, False),
+    'get_product': (lambda db, ctx: db.get_product(ctx.product()), False),
+    'product_exists': (lambda db, ctx: db.product_exists(ctx.product()), False),
+    'search_products': (lambda db, ctx: db.search_products(f"Product {ctx.product()}", 10), False),
+    'search_products_prefix': (lambda db, ctx: db.search_products("Synth", 10), False),
+    'get_order': (lambda db, ctx: db.get_order(ctx.order()), False),
+    'get_order_status': (lambda db, ctx: db.get_order_status(ctx.order()), False),
+    'get_order_items': (lambda db, ctx: db.get_order_items(ctx.order()), False),
+    'get_order_items_with_products': (lambda db, ctx: db.get_order_items_with_products(ctx.order()), False),
+    'get_shipment': (lambda db, ctx: db.get_shipment(ctx.shipment()), False),
+    'get_shipment_status': (lambda db, ctx: db.get_shipment_status(ctx.shipment()), False),
+    'get_shipment_details': (lambda db, ctx: db.get_shipment_details(ctx.shipment()), False),
+    'get_max_order_id': (lambda db, ctx: db.get_max_order_id(), False),
+    'get_max_shipment_id': (lambda db, ctx: db.get_max_shipment_id(), False),
+    'get_max_supplier_id': (lambda db, ctx: db.get_max_supplier_id(), False),
+    'get_supplier_by_name': (lambda db, ctx: db.get_supplier_by_name(f"Supplier {ctx.rng.randint(1, 10)}"), False),
+    'reserve_ids': (lambda db, ctx: db.reserve_ids('orders', 100), False),
+    'get_all_products': (lambda db, ctx: db.get_all_products(), True),
+    'get_all_orders': (lambda db, ctx: db.get_all_orders(), True),
+    'get_all_shipments': (lambda db, ctx: db.get_all_shipments(), True),
+    'get_supply_records': (lambda db, ctx: db.get_supply_records(), True),
+    'iter_products': (lambda db, ctx: _consume(db.iter_products()), True),
+    'iter_suppliers': (lambda db, ctx: _consume(db.iter_suppliers()), True),
+    'iter_orders': (lambda db, ctx: _consume(db.iter_orders()), True),
+    'iter_shipments': (lambda db, ctx: _consume(db.iter_shipments()), True),
+    'iter_supply_records': (lambda db, ctx: _consume(db.iter_supply_records()), True),
+    'get_daily_revenue': (lambda db, ctx: db.get_daily_revenue(), False),
+    'get_revenue_summary': (lambda db, ctx: db.get_revenue_summary(), False),
+    'get_top_products': (lambda db, ctx: db.get_top_products(10), False),
+    'get_product_daily_sales': (lambda db, ctx: db.get_product_daily_sales(ctx.product()), False),
+    'get_supplier_supply': (lambda db, ctx: db.get_supplier_supply(), False),
+    'rebuild_aggregates': (lambda db, ctx: db.rebuild_aggregates(), True),
+    'flush': (lambda db, ctx: db.flush(), False),
+    'refresh_snapshot': (lambda db, ctx: db.refresh_snapshot(), True),
+}
+
+def time_case(db: Database, ctx: Context, operation, repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation(db, ctx)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'runs': repeats,
+        'min_ms': timings[0],
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'max_ms': timings[-1],
+    }
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(fixture: str, repeats: int, cases: List[str], seed: int) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp()
+    try:
+        scratch = os.path.join(workdir, "bench.db")
+        shutil.copy(fixture, scratch)
+        db = Database(scratch)
+        ctx = Context(db, seed)
+
+        results = {}
+        for name in cases:
+            operation, is_listing = CASES[name]
+            if name in SNAPSHOT_CASES:
+                db.enable_snapshots()
+            try:
+                results[name] = time_case(db, ctx, operation, min(repeats, LISTING_REPEATS) if is_listing else repeats)
+            finally:
+                db.disable_snapshots()
+            print(f"{name:<32} median {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+        db.close()
+    finally:
+        shutil.rmtree(workdir)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'fixture': os.path.basename(fixture),
+            'repeats': repeats,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'results': results,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before or not before['median_ms']:
+            continue
+        ratio = stats['median_ms'] / before['median_ms']
+        if ratio > threshold:
+            regressions.append(f"{name}: {before['median_ms']:.3f} ms -> {stats['median_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every public Database method against a fixture")
+    parser.add_argument("--fixture", help="Existing fixture database; generated if missing")
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Median slowdown ratio that counts as a regression")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fixture = args.fixture or os.path.join(tempfile.gettempdir(), f"warehouse_bench_{args.size}.db")
+    if not os.path.exists(fixture):
+        print(f"Generating {args.size} fixture at {fixture}...", file=sys.stderr)
+        generate(fixture, SIZES[args.size], args.seed)
+
+    results = run(fixture, args.repeats, args.cases, args.seed)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for regression in regressions:
+            print(f"❌ Regression in {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict
+from database import Database
+
+SIZES = {
+    'small': 10_000,
+    'medium': 1_000_000,
+    'large': 10_000_000,
+}
+
+STATUSES = ["Pending", "Placed", "Shipped", "Delivered", "Cancelled"]
+STATUS_WEIGHTS = [10, 20, 30, 35, 5]
+CHUNK_SIZE = 50_000
+
+def _chunks(rows, size: int = CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _insert(db: Database, query: str, rows):
+    for chunk in _chunks(rows):
+        db.conn.executemany(query, chunk)
+        db.conn.commit()
+
+def _day(start: date, offset: int) -> str:
+    return str(start + timedelta(days=offset))
+
+def generate(db_name: str, orders: int, seed: int = 42, days: int = 730) -> Dict[str, int]:
+    rng = random.Random(seed)
+    products = max(100, orders // 10)
+    suppliers = max(10, orders // 1000)
+    supply_records = max(100, orders // 2)
+    start = date.today() - timedelta(days=days)
+
+    db = Database(db_name)
+    db.conn.execute('PRAGMA synchronous = OFF')
+    db.conn.execute('PRAGMA journal_mode = MEMORY')
+
+    prices = [round(rng.uniform(1, 500), 2) for _ in range(products)]
+    supplier_names = [f"Supplier {i}" for i in range(1, suppliers + 1)]
+
+    _insert(db, '''
+    INSERT INTO suppliers (supplierId, name, contact)
+    VALUES (?, ?, ?)
+    ''', ((i, supplier_names[i - 1], f"supplier{i}@example.com") for i in range(1, suppliers + 1)))
+
+    _insert(db, '''
+    INSERT INTO products (productId, name, description, price, stockQuantity, supplierId)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', ((i, f"Product {i}", f"Synthetic product {i} for benchmarking", prices[i - 1],
+           rng.randint(0, 1000), rng.randint(1, suppliers)) for i in range(1, products + 1)))
+
+    def popular_product() -> int:
+        return min(products, int(rng.paretovariate(1.2)))
+
+    item_counter = [0]
+
+    def order_rows():
+        for order_id in range(1, orders + 1):
+            yield (order_id, _day(start, rng.randrange(days)),
+                   rng.choices(STATUSES, STATUS_WEIGHTS)[0], 0.0)
+
+    def item_rows():
+        for order_id in range(1, orders + 1):
+            for _ in range(min(50, int(rng.paretovariate(1.5)))):
+                product_id = popular_product()
+                quantity = rng.randint(1, 5)
+                item_counter[0] += 1
+                yield (order_id, product_id, quantity, prices[product_id - 1] * quantity)
+
+    _insert(db, '''
+    INSERT INTO orders (orderId, orderDate, status, totalAmount)
+    VALUES (?, ?, ?, ?)
+    ''', order_rows())
+
+    _insert(db, '''
+    INSERT INTO order_items (orderId, productId, quantity, price)
+    VALUES (?, ?, ?, ?)
+    ''', item_rows())
+
+    db.conn.execute('''
+    UPDATE orders
+    SET totalAmount = (SELECT COALESCE(SUM(price), 0) FROM order_items WHERE order_items.orderId = orders.orderId)
+    ''')
+    db.conn.commit()
+
+    shipments = [0]
+
+    def shipment_rows():
+        for order_id in range(1, orders + 1):
+            if rng.random() < 0.6:
+                shipments[0] += 1
+                yield (shipments[0], order_id, _day(start, rng.randrange(days)),
+                       rng.choice(["Shipped", "Delivered"]))
+
+    _insert(db, '''
+    INSERT INTO shipments (shipmentId, orderId, shipmentDate, status)
+    VALUES (?, ?, ?, ?)
+    ''', shipment_rows())
+
+    _insert(db, '''
+    INSERT INTO supply_records (productId, quantity, supplierId, supplyDate)
+    VALUES (?, ?, ?, ?)
+    ''', ((product_id, rng.randint(10, 500), rng.randint(1, suppliers), _day(start, rng.randrange(days)))
+          for product_id in (rng.randint(1, products) for _ in range(supply_records))))
+
+    db.close()
+    return {
+        'products': products,
+        'suppliers': suppliers,
+        'orders': orders,
+        'order_items': item_counter[0],
+        'shipments': shipments[0],
+        'supply_records': supply_records,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic warehouse.db fixture")
+    parser.add_argument("db_name")
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--orders", type=int, help="Override the number of orders")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.db_name, args.orders or SIZES[args.size], args.seed)
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table:<16} {count:>12,}")
+    print(f"Generated in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from typing import Dict, List, Optional
+from database import Database
+
+WINDOWS_MS = [None, 1, 5, 20, 100]
+
+def _writes(db: Database, count: int):
+    today = str(date.today())
+    for i in range(count):
+        product_id = 1 + i % 100
+        if i % 2:
+            db.update_product_stock(product_id, 1)
+        else:
+            db.add_supply_record({'product_id': product_id, 'quantity': 1, 'supplier_name': "Bench supplier",
+                                  'supply_date': today})
+
+def run(writes: int, windows: List[Optional[float]], ops: int, pooled: bool) -> Dict[str, float]:
+    results = {}
+    for window in windows:
+        workdir = tempfile.mkdtemp()
+        try:
+            db = Database(os.path.join(workdir, "bench.db"), pooled=pooled,
+                          group_commit_ms=window, group_commit_ops=ops)
+            db.add_products([{'productId': i, 'name': f"Product {i}", 'description': "", 'price': 1.0,
+                              'stockQuantity': 0} for i in range(1, 101)])
+            db.flush()
+            start = time.perf_counter()
+            _writes(db, writes)
+            db.close()
+            results['per-write commit' if window is None else f"{window:g} ms window"] = \
+                writes / (time.perf_counter() - start)
+        finally:
+            shutil.rmtree(workdir)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes/sec with and without group commit")
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--windows", type=float, nargs="+", help="Group commit windows in ms")
+    parser.add_argument("--ops", type=int, default=1000, help="Flush after this many writes")
+    parser.add_argument("--pooled", action="store_true", help="Use the WAL connection pool")
+    args = parser.parse_args()
+
+    windows = [None] + args.windows if args.windows else WINDOWS_MS
+    print(f"{args.writes:,} mixed add_supply_record/update_product_stock writes")
+    for name, rate in run(args.writes, windows, args.ops, args.pooled).items():
+        print(f"{name:<20} {rate:>12,.0f} writes/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+from Model.product_class import Product
+from Model.wareHouse_class import Warehouse
+
+def timed(operation, count: int) -> float:
+    start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float('inf')
+
+def run(skus: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    products = [Product(i, f"Product {i}", "", 9.99, rng.randint(0, 50), f"Supplier {i % 1000}")
+                for i in range(1, skus + 1)]
+    warehouse = Warehouse(1, "Benchmark", capacity=skus * 100)
+    sample = [rng.randint(1, skus) for _ in range(min(skus, 100_000))]
+
+    def add_all():
+        for product in products:
+            warehouse.addProduct(product)
+
+    def check_all():
+        for pid in sample:
+            warehouse.inventory.checkStock(pid)
+
+    def update_all():
+        for pid in sample:
+            warehouse.updateStock(pid, 1)
+
+    def remove_all():
+        for pid in sample:
+            warehouse.removeProduct(pid)
+
+    return {
+        'add_per_sec': timed(add_all, skus),
+        'check_stock_per_sec': timed(check_all, len(sample)),
+        'update_stock_per_sec': timed(update_all, len(sample)),
+        'low_stock_scan_per_sec': timed(warehouse.inventory.getLowStockProducts, 1),
+        'by_supplier_per_sec': timed(lambda: warehouse.inventory.getProductsBySupplier("Supplier 7"), 1),
+        'remove_per_sec': timed(remove_all, len(sample)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory and Warehouse operation throughput")
+    parser.add_argument("--skus", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for skus in args.skus:
+        print(f"\n{skus:,} SKUs")
+        for name, rate in run(skus).items():
+            print(f"{name:<24} {rate:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
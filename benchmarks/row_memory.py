@@ -0,0 +1,73 @@
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+from Model.product_class import Product
+from database import Database
+
+def populate(db_name: str, rows: int):
+    db = Database(db_name)
+    db.conn.executemany('''
+    INSERT INTO suppliers (supplierId, name, contact)
+    VALUES (?, ?, ?)
+    ''', ((i, f"Supplier {i}", f"supplier{i}@example.com") for i in range(1, 1001)))
+    db.conn.executemany('''
+    INSERT INTO products (productId, name, description, price, stockQuantity, supplierId)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', ((i, f"Product {i}", f"Description of product {i}", 9.99 + i % 100, i % 500, 1 + i % 1000)
+          for i in range(1, rows + 1)))
+    db.conn.executemany('''
+    INSERT INTO orders (orderId, orderDate, status, totalAmount)
+    VALUES (?, ?, ?, ?)
+    ''', ((i, f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", "Pending", 19.98 + i % 300)
+          for i in range(1, rows + 1)))
+    db.conn.commit()
+    db.close()
+
+def measure(build, rows: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / rows
+
+def run(rows: int) -> dict:
+    fd, db_name = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        populate(db_name, rows)
+        plain_db = Database(db_name)
+        compact_db = Database(db_name, compact_rows=True)
+
+        results = {
+            'products_dict_rows': measure(plain_db.get_all_products, rows),
+            'products_compact_rows': measure(compact_db.get_all_products, rows),
+            'orders_dict_rows': measure(plain_db.get_all_orders, rows),
+            'orders_compact_rows': measure(compact_db.get_all_orders, rows),
+            'product_objects_plain': measure(
+                lambda: [SimpleNamespace(**p) for p in compact_db.get_all_products()], rows),
+            'product_objects_slots': measure(
+                lambda: [Product(**p) for p in compact_db.get_all_products()], rows),
+        }
+
+        plain_db.close()
+        compact_db.close()
+        return results
+    finally:
+        os.remove(db_name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row memory of dict rows vs compact rows")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Bytes per row for {args.rows:,} products and orders")
+    for name, per_row in run(args.rows).items():
+        print(f"{name:<24} {per_row:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Tuple
+from database import Database
+from Model.product_class import Product
+
+CATALOG_SIZES = {
+    'empty': 0,
+    '100k': 100_000,
+    '5m': 5_000_000,
+}
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def populate(db_name: str, products: int):
+    db = Database(db_name)
+    db.conn.execute('PRAGMA synchronous = OFF')
+    db.conn.execute('PRAGMA journal_mode = MEMORY')
+    db.conn.executemany('''
+    INSERT INTO suppliers (supplierId, name, contact)
+    VALUES (?, ?, ?)
+    ''', ((i, f"Supplier {i}", f"supplier{i}@example.com") for i in range(1, 1001)))
+    db.conn.executemany('''
+    INSERT INTO products (productId, name, description, price, stockQuantity, supplierId)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', ((i, f"Product {i}", None, 9.99 + i % 100, i % 500, 1 + i % 1000)
+          for i in range(1, products + 1)))
+    db.conn.commit()
+    db.close()
+
+def fixture(size: str) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"warehouse_startup_{size}.db")
+    if not os.path.exists(path):
+        print(f"Generating {size} catalog at {path}...", file=sys.stderr)
+        populate(path, CATALOG_SIZES[size])
+    return path
+
+# Reaps the child with wait4 to read that process's own peak RSS; RUSAGE_CHILDREN would
+# report the largest of every child started so far.
+def run_startup(workdir: str) -> Tuple[float, int]:
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, MAIN], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, cwd=workdir, text=True)
+    proc.stdin.write("6\n")
+    proc.stdin.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+    return elapsed, usage.ru_maxrss
+
+def time_startup(db_name: str, runs: int) -> Dict[str, float]:
+    workdir = tempfile.mkdtemp()
+    try:
+        shutil.copy(db_name, os.path.join(workdir, "warehouse.db"))
+        timings = []
+        peak_rss_kb = 0
+        for _ in range(runs):
+            seconds, rss_kb = run_startup(workdir)
+            timings.append(seconds)
+            peak_rss_kb = max(peak_rss_kb, rss_kb)
+        return {
+            'min_sec': min(timings),
+            'max_sec': max(timings),
+            'peak_rss_mb': peak_rss_kb / 1024,
+        }
+    finally:
+        shutil.rmtree(workdir)
+
+def time_eager_load(db_name: str) -> float:
+    db = Database(db_name)
+    start = time.perf_counter()
+    products = {p['productId']: Product(**p) for p in db.get_all_products()}
+    elapsed = time.perf_counter() - start
+    del products
+    db.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Time interactive CLI startup against catalogs of different sizes")
+    parser.add_argument("--sizes", nargs="+", choices=CATALOG_SIZES, default=list(CATALOG_SIZES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compare-eager", action="store_true",
+                        help="Also time loading every product into memory, as startup used to")
+    args = parser.parse_args()
+
+    print(f"{'Catalog':<8} {'Products':>10} {'Min s':>8} {'Max s':>8} {'Peak RSS MB':>12}"
+          + (f" {'Eager load s':>13}" if args.compare_eager else ""))
+    for size in args.sizes:
+        db_name = fixture(size)
+        result = time_startup(db_name, args.runs)
+        line = (f"{size:<8} {CATALOG_SIZES[size]:>10,} {result['min_sec']:>8.3f} {result['max_sec']:>8.3f} "
+                f"{result['peak_rss_mb']:>12.1f}")
+        if args.compare_eager:
+            line += f" {time_eager_load(db_name):>13.3f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from database import Database
+
+MAX_REPORTED_ERRORS = 100
+
+class TransferReport:
+    def __init__(self, table: str):
+        self.table = table
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.errors: List[str] = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line: Optional[int], reason: str):
+        self.rows_rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {reason}" if line is not None else reason)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'table': self.table,
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'rows_rejected': self.rows_rejected,
+            'elapsed_sec': self.elapsed,
+            'rows_per_sec': self.rows_per_sec,
+            'errors': self.errors,
+        }
+
+def _format_of(path: str, fmt: Optional[str]) -> str:
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unsupported format '{fmt}'. Use csv or jsonl")
+    return fmt
+
+def read_rows(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    fmt = _format_of(path, fmt)
+    with open(path, newline='') as f:
+        if fmt == 'csv':
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield line, row
+        else:
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    yield line, json.loads(text)
+
+def _required(row: Dict[str, Any], field: str) -> Any:
+    value = row.get(field)
+    if value is None or value == '':
+        raise ValueError(f"Missing {field}")
+    return value
+
+def _optional(row: Dict[str, Any], field: str) -> Optional[str]:
+    value = row.get(field)
+    return None if value == '' else value
+
+def _non_negative_int(row: Dict[str, Any], field: str) -> int:
+    value = int(_required(row, field))
+    if value < 0:
+        raise ValueError(f"{field} must not be negative")
+    return value
+
+def _positive_int(row: Dict[str, Any], field: str) -> int:
+    value = int(_required(row, field))
+    if value <= 0:
+        raise ValueError(f"{field} must be positive")
+    return value
+
+def _non_negative_float(row: Dict[str, Any], field: str) -> float:
+    value = float(_required(row, field))
+    if value < 0:
+        raise ValueError(f"{field} must not be negative")
+    return value
+
+def validate_product(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'productId': _positive_int(row, 'productId'),
+        'name': str(_required(row, 'name')),
+        'description': _optional(row, 'description'),
+        'price': _non_negative_float(row, 'price'),
+        'stockQuantity': _non_negative_int(row, 'stockQuantity'),
+        'supplierName': _optional(row, 'supplierName'),
+    }
+
+def validate_supplier(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'supplierId': _positive_int(row, 'supplierId'),
+        'name': str(_required(row, 'name')),
+        'contact': str(_required(row, 'contact')),
+    }
+
+def validate_supply_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'product_id': _positive_int(row, 'productId'),
+        'quantity': _positive_int(row, 'quantity'),
+        'supplier_name': str(_required(row, 'supplierName')),
+        'supply_date': str(_required(row, 'supplyDate')),
+    }
+
+def validate_order_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'productId': _positive_int(row, 'productId'),
+        'quantity': _positive_int(row, 'quantity'),
+        'price': _non_negative_float(row, 'price'),
+    }
+
+def validate_order(row: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    items = [validate_order_item(item) for item in row.get('items') or []]
+    if not items:
+        raise ValueError("Order has no items")
+    order = {
+        'orderId': _positive_int(row, 'orderId'),
+        'orderDate': str(_required(row, 'orderDate')),
+        'status': str(row.get('status') or "Pending"),
+    }
+    order['totalAmount'] = float(row['totalAmount']) if row.get('totalAmount') not in (None, '') \
+        else sum(item['price'] for item in items)
+    return order, items
+
+def _group_order_lines(rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    current = None
+    first_line = 0
+    for line, row in rows:
+        if 'items' in row:
+            if current is not None:
+                yield first_line, current
+                current = None
+            yield line, row
+            continue
+        if current is None or str(current['orderId']) != str(row.get('orderId')):
+            if current is not None:
+                yield first_line, current
+            current = {key: row.get(key) for key in ('orderId', 'orderDate', 'status', 'totalAmount')}
+            current['items'] = []
+            first_line = line
+        if row.get('productId') not in (None, ''):
+            current['items'].append(row)
+    if current is not None:
+        yield first_line, current
+
+def _import(db: Database, table: str, rows: Iterator[Tuple[int, Dict[str, Any]]],
+            validate: Callable, write: Callable[[List[Any], TransferReport], int], chunk_size: int,
+            progress: Optional[Callable[[TransferReport], None]]) -> TransferReport:
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+
+    report = TransferReport(table)
+    chunk = []
+    lines = []
+
+    # A failed chunk is rolled back as a whole, so it is retried one row at a time to
+    # reject only the rows that actually fail.
+    def flush():
+        if not chunk:
+            return
+        try:
+            report.rows_written += write(chunk, report)
+        except Exception:
+            for line, row in zip(lines, chunk):
+                try:
+                    report.rows_written += write([row], report)
+                except Exception as e:
+                    report.reject(line, str(e))
+        chunk.clear()
+        lines.clear()
+        if progress:
+            progress(report)
+
+    for line, row in rows:
+        report.rows_read += 1
+        try:
+            chunk.append(validate(row))
+            lines.append(line)
+        except (ValueError, TypeError, KeyError) as e:
+            report.reject(line, str(e))
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    return report
+
+def import_products(db: Database, path: str, fmt: Optional[str] = None, chunk_size: int = 5000,
+                    upsert: bool = False, progress: Optional[Callable[[TransferReport], None]] = None) -> TransferReport:
+    return _import(db, 'products', read_rows(path, fmt), validate_product,
+                   lambda chunk, report: db.add_products(chunk, upsert=upsert), chunk_size, progress)
+
+def import_suppliers(db: Database, path: str, fmt: Optional[str] = None, chunk_size: int = 5000,
+                     progress: Optional[Callable[[TransferReport], None]] = None) -> TransferReport:
+    return _import(db, 'suppliers', read_rows(path, fmt), validate_supplier,
+                   lambda chunk, report: db.add_suppliers(chunk), chunk_size, progress)
+
+def import_supply_records(db: Database, path: str, fmt: Optional[str] = None, chunk_size: int = 5000,
+                          progress: Optional[Callable[[TransferReport], None]] = None) -> TransferReport:
+    return _import(db, 'supply_records', read_rows(path, fmt), validate_supply_record,
+                   lambda chunk, report: db.add_supply_records(chunk), chunk_size, progress)
+
+def import_orders(db: Database, path: str, fmt: Optional[str] = None, chunk_size: int = 1000,
+                  reserve_stock: bool = False,
+                  progress: Optional[Callable[[TransferReport], None]] = None) -> TransferReport:
+    def write(chunk, report):
+        result = db.add_orders(chunk, reserve_stock=reserve_stock)
+        for order_id, reason in result['rejected'].items():
+            report.reject(None, f"order {order_id}: {reason}")
+        return len(result['accepted'])
+
+    return _import(db, 'orders', _group_order_lines(read_rows(path, fmt)), validate_order,
+                   write, chunk_size, progress)
+
+PRODUCT_FIELDS = ['productId', 'name', 'description', 'price', 'stockQuantity', 'supplierName']
+SUPPLIER_FIELDS = ['supplierId', 'name', 'contact']
+SUPPLY_RECORD_FIELDS = ['recordId', 'productId', 'productName', 'quantity', 'supplierName', 'supplyDate']
+ORDER_LINE_FIELDS = ['orderId', 'orderDate', 'status', 'totalAmount', 'productId', 'quantity', 'price']
+
+ORDER_FILTERS = {'status': 'o.status = ?', 'start_date': 'o.orderDate >= ?', 'end_date': 'o.orderDate <= ?'}
+
+def _order_lines(db: Database, page_size: int, **filters) -> Iterator[Dict[str, Any]]:
+    conditions = [ORDER_FILTERS[name] for name, value in filters.items() if value is not None]
+    params = [str(value) for value in filters.values() if value is not None]
+    query = '''
+    SELECT o.orderId, o.orderDate, o.status, o.totalAmount, i.productId, i.quantity, i.price
+    FROM orders o
+    LEFT JOIN order_items i ON i.orderId = o.orderId
+    '''
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY o.orderId'
+
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        lines = iter(lambda: cursor.fetchmany(page_size), [])
+        for _, rows in groupby((row for chunk in lines for row in chunk), key=lambda row: row[0]):
+            rows = list(rows)
+            order_id, order_date, status, total_amount = rows[0][:4]
+            yield {
+                'orderId': order_id,
+                'orderDate': order_date,
+                'status': status,
+                'totalAmount': total_amount,
+                'items': [{'productId': row[4], 'quantity': row[5], 'price': row[6]}
+                          for row in rows if row[4] is not None],
+            }
+
+def _write(rows: Iterator[Dict[str, Any]], path: str, fmt: Optional[str], fields: List[str],
+           report: TransferReport, progress: Optional[Callable[[TransferReport], None]], every: int,
+           flatten: Optional[Callable[[Dict[str, Any]], Iterator[Dict[str, Any]]]] = None) -> TransferReport:
+    fmt = _format_of(path, fmt)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore') if fmt == 'csv' else None
+        if writer:
+            writer.writeheader()
+        for row in rows:
+            report.rows_read += 1
+            if writer:
+                for line in (flatten(row) if flatten else [row]):
+                    writer.writerow(dict(line))
+            else:
+                f.write(json.dumps(dict(row)) + '\n')
+            report.rows_written += 1
+            if progress and report.rows_written % every == 0:
+                progress(report)
+    if progress:
+        progress(report)
+    return report
+
+def export_table(db: Database, table: str, path: str, fmt: Optional[str] = None, page_size: int = 5000,
+                 progress: Optional[Callable[[TransferReport], None]] = None, **filters) -> TransferReport:
+    report = TransferReport(table)
+    if table == 'products':
+        return _write(db.iter_products(page_size=page_size), path, fmt, PRODUCT_FIELDS, report, progress, page_size)
+    if table == 'suppliers':
+        return _write(db.iter_suppliers(page_size=page_size), path, fmt, SUPPLIER_FIELDS, report, progress, page_size)
+    if table == 'supply_records':
+        return _write(db.iter_supply_records(page_size=page_size, **filters), path, fmt,
+                      SUPPLY_RECORD_FIELDS, report, progress, page_size)
+    if table == 'orders':
+        return _write(_order_lines(db, page_size, **filters), path, fmt, ORDER_LINE_FIELDS, report, progress,
+                      page_size, flatten=lambda order: (dict(order, **item) for item in order['items'] or [{}]))
+    raise ValueError(f"Unknown table '{table}'")
+
+IMPORTERS = {
+    'products': import_products,
+    'suppliers': import_suppliers,
+    'supply_records': import_supply_records,
+    'orders': import_orders,
+}
+
+def print_progress(report: TransferReport):
+    print(f"\r{report.table}: {report.rows_read:,} read, {report.rows_written:,} written, "
+          f"{report.rows_rejected:,} rejected ({report.rows_per_sec:,.0f} rows/s)", end='', file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream bulk imports and exports of warehouse data")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("table", choices=list(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--db", default="warehouse.db")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--upsert", action="store_true", help="Update existing products instead of rejecting them")
+    parser.add_argument("--reserve-stock", action="store_true",
+                        help="Take imported order quantities out of product stock instead of loading them as history")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.action == "import":
+            kwargs = {'upsert': args.upsert} if args.table == 'products' else {}
+            if args.table == 'orders':
+                kwargs = {'reserve_stock': args.reserve_stock}
+            report = IMPORTERS[args.table](db, args.path, args.format, args.chunk_size,
+                                           progress=print_progress, **kwargs)
+        else:
+            report = export_table(db, args.table, args.path, args.format, args.chunk_size, progress=print_progress)
+    finally:
+        db.close()
+
+    print(file=sys.stderr)
+    for error in report.errors:
+        print(f"❌ {error}", file=sys.stderr)
+    print(json.dumps(report.to_dict(), indent=2))
+    return 1 if report.rows_rejected else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
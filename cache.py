@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from database import Database
+
+_MISSING = object()
+
+class LRUCache:
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 60.0):
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: Any, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, key: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+class CachedDatabase:
+    def __init__(self, db: Database, max_size: int = 10000, ttl: Optional[float] = 60.0):
+        self.db = db
+        self.products = LRUCache(max_size, ttl)
+        self.orders = LRUCache(max_size, ttl)
+        self.order_items = LRUCache(max_size, ttl)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    def _read_through(self, cache: LRUCache, key: Any, load) -> Any:
+        value = cache.get(key)
+        if value is _MISSING:
+            value = load(key)
+            if value is None:
+                return None
+            cache.put(key, value)
+        return _copy(value)
+
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        return self._read_through(self.products, product_id, self.db.get_product)
+
+    def product_exists(self, product_id: int) -> bool:
+        if self.products.get(product_id) is not _MISSING:
+            return True
+        return self.db.product_exists(product_id)
+
+    def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        return self._read_through(self.orders, order_id, self.db.get_order)
+
+    def get_order_status(self, order_id: int) -> Optional[str]:
+        order = self.get_order(order_id)
+        return order['status'] if order else None
+
+    def get_order_items(self, order_id: int) -> List[Dict[str, Any]]:
+        return self._read_through(self.order_items, order_id, self.db.get_order_items)
+
+    def add_product(self, product: Dict[str, Any]):
+        self.db.add_product(product)
+        self.products.evict(product['productId'])
+
+    def add_products(self, products: List[Dict[str, Any]], upsert: bool = False) -> int:
+        try:
+            return self.db.add_products(products, upsert)
+        finally:
+            for product in products:
+                self.products.evict(product['productId'])
+
+    def update_product_stock(self, productId: int, quantity: int):
+        self.db.update_product_stock(productId, quantity)
+        self.products.evict(productId)
+
+    def remove_product(self, product_id: int):
+        try:
+            self.db.remove_product(product_id)
+        finally:
+            self.products.evict(product_id)
+            self.order_items.clear()
+
+    def cancel_order(self, order_id: int, update_memory: bool = False):
+        returned_quantities = self.db.cancel_order(order_id, update_memory=True)
+        self.orders.evict(order_id)
+        for product_id in returned_quantities:
+            self.products.evict(product_id)
+        return returned_quantities if update_memory else None
+
+    def cancel_orders(self, order_ids: List[int]) -> Dict[str, Any]:
+        result = self.db.cancel_orders(order_ids)
+        self._evict_cancelled(result['cancelled'], result['restocked'])
+        return result
+
+    def expire_pending_orders(self, older_than_days: int, chunk_size: int = 500,
+                              statuses: Tuple[str, ...] = ('Pending',)) -> Dict[str, Any]:
+        result = self.db.expire_pending_orders(older_than_days, chunk_size, statuses)
+        self._evict_cancelled(result['expired'], result['restocked'])
+        return result
+
+    def _evict_cancelled(self, order_ids: List[int], restocked: Dict[int, int]):
+        for order_id in order_ids:
+            self.orders.evict(order_id)
+        for product_id in restocked:
+            self.products.evict(product_id)
+
+    def update_order_status(self, order_id: int, new_status: str):
+        self.db.update_order_status(order_id, new_status)
+        self.orders.evict(order_id)
+
+    def update_shipment_statuses(self, updates) -> Dict[str, Any]:
+        result = self.db.update_shipment_statuses(updates)
+        for order_id in result['orders_updated']:
+            self.orders.evict(order_id)
+        return result
+
+    def add_order(self, order: Dict[str, Any], items: List[Dict[str, Any]]):
+        self.db.add_order(order, items)
+        self._evict_order(order['orderId'], items)
+
+    def place_order(self, order: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        result = self.db.place_order(order, items)
+        self._evict_order(order['orderId'], items)
+        return result
+
+    def add_orders(self, batch, reserve_stock: bool = True) -> Dict[str, Any]:
+        result = self.db.add_orders(batch, reserve_stock)
+        for order, items in batch:
+            self._evict_order(order['orderId'], items)
+        return result
+
+    def _evict_order(self, order_id: int, items: List[Dict[str, Any]]):
+        self.orders.evict(order_id)
+        self.order_items.evict(order_id)
+        for item in items:
+            self.products.evict(item['productId'])
+
+    def invalidate(self, product_id: Optional[int] = None, order_id: Optional[int] = None):
+        if product_id is None and order_id is None:
+            self.products.clear()
+            self.orders.clear()
+            self.order_items.clear()
+            return
+        if product_id is not None:
+            self.products.evict(product_id)
+        if order_id is not None:
+            self.orders.evict(order_id)
+            self.order_items.evict(order_id)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            'products': self.products.stats(),
+            'orders': self.orders.stats(),
+            'order_items': self.order_items.stats(),
+        }
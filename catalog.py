@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+from Model.product_class import Product
+
+class LazyCatalog:
+    def __init__(self, db):
+        self.db = db
+        self._loaded: Dict[int, Product] = {}
+
+    def __contains__(self, product_id: int) -> bool:
+        return product_id in self._loaded or self.db.product_exists(product_id)
+
+    def __getitem__(self, product_id: int) -> Product:
+        product = self._loaded.get(product_id)
+        if product is None:
+            row = self.db.get_product(product_id)
+            if row is None:
+                raise KeyError(product_id)
+            product = self._loaded[product_id] = Product(**row)
+        return product
+
+    def __setitem__(self, product_id: int, product: Product):
+        self._loaded[product_id] = product
+
+    def __delitem__(self, product_id: int):
+        self._loaded.pop(product_id, None)
+
+    def get(self, product_id: int, default: Optional[Product] = None) -> Optional[Product]:
+        try:
+            return self[product_id]
+        except KeyError:
+            return default
+
+    def peek(self, product_id: int) -> Optional[Product]:
+        return self._loaded.get(product_id)
+
+    def loaded_count(self) -> int:
+        return len(self._loaded)
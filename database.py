@@ -1,12 +1,791 @@
+import os
+import re
 import sqlite3
-from datetime import date
-from typing import List, Dict, Any, Optional
+import functools
+import queue
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+SALES_AGGREGATE_REBUILD = [
+    'DELETE FROM daily_revenue',
+    '''
+    INSERT INTO daily_revenue (day, orderCount, revenue)
+    SELECT substr(orderDate, 1, 10), COUNT(*), SUM(totalAmount)
+    FROM orders
+    WHERE status != 'Cancelled'
+    GROUP BY substr(orderDate, 1, 10)
+    ''',
+    'DELETE FROM daily_product_sales',
+    '''
+    INSERT INTO daily_product_sales (day, productId, unitsSold, revenue)
+    SELECT substr(o.orderDate, 1, 10), oi.productId, SUM(oi.quantity), SUM(oi.price)
+    FROM order_items oi
+    JOIN orders o ON oi.orderId = o.orderId
+    WHERE o.status != 'Cancelled'
+    GROUP BY substr(o.orderDate, 1, 10), oi.productId
+    ''',
+]
+
+SUPPLY_AGGREGATE_REBUILD = [
+    'DELETE FROM daily_supplier_supply',
+    '''
+    INSERT INTO daily_supplier_supply (supplierId, day, recordCount, quantity)
+    SELECT supplierId, substr(supplyDate, 1, 10), COUNT(*), SUM(quantity)
+    FROM supply_records
+    GROUP BY supplierId, substr(supplyDate, 1, 10)
+    ''',
+]
+
+AGGREGATE_REBUILD = SALES_AGGREGATE_REBUILD + SUPPLY_AGGREGATE_REBUILD
+
+# Migration 2 runs against the schema from before migration 5, where supply records and
+# daily_supplier_supply were keyed by supplierName; it keeps its original rebuild.
+LEGACY_AGGREGATE_REBUILD = SALES_AGGREGATE_REBUILD + [
+    'DELETE FROM daily_supplier_supply',
+    '''
+    INSERT INTO daily_supplier_supply (supplierName, day, recordCount, quantity)
+    SELECT supplierName, substr(supplyDate, 1, 10), COUNT(*), SUM(quantity)
+    FROM supply_records
+    GROUP BY supplierName, substr(supplyDate, 1, 10)
+    ''',
+]
+
+MIGRATIONS = [
+    [
+        'CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (orderId, productId, quantity, price)',
+        'CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items (productId)',
+        'CREATE INDEX IF NOT EXISTS idx_supply_records_product ON supply_records (productId)',
+        'CREATE INDEX IF NOT EXISTS idx_supply_records_date ON supply_records (supplyDate)',
+        'CREATE INDEX IF NOT EXISTS idx_shipments_order ON shipments (orderId)',
+        'CREATE INDEX IF NOT EXISTS idx_shipments_date ON shipments (shipmentDate)',
+        'CREATE INDEX IF NOT EXISTS idx_orders_date ON orders (orderDate)',
+    ],
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS daily_revenue (
+            day TEXT PRIMARY KEY,
+            orderCount INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_product_sales (
+            day TEXT NOT NULL,
+            productId INTEGER NOT NULL,
+            unitsSold INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, productId)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_daily_product_sales_product ON daily_product_sales (productId, day)',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_supplier_supply (
+            supplierName TEXT NOT NULL,
+            day TEXT NOT NULL,
+            recordCount INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (supplierName, day)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_daily_supplier_supply_day ON daily_supplier_supply (day)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_insert_aggregates
+        AFTER INSERT ON orders WHEN NEW.status != 'Cancelled'
+        BEGIN
+            INSERT INTO daily_revenue (day, orderCount, revenue)
+            VALUES (substr(NEW.orderDate, 1, 10), 1, NEW.totalAmount)
+            ON CONFLICT (day) DO UPDATE SET
+                orderCount = orderCount + 1,
+                revenue = revenue + excluded.revenue;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_delete_aggregates
+        AFTER DELETE ON orders WHEN OLD.status != 'Cancelled'
+        BEGIN
+            UPDATE daily_revenue
+            SET orderCount = orderCount - 1, revenue = revenue - OLD.totalAmount
+            WHERE day = substr(OLD.orderDate, 1, 10);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_cancel_aggregates
+        AFTER UPDATE OF status ON orders WHEN OLD.status != 'Cancelled' AND NEW.status = 'Cancelled'
+        BEGIN
+            UPDATE daily_revenue
+            SET orderCount = orderCount - 1, revenue = revenue - OLD.totalAmount
+            WHERE day = substr(OLD.orderDate, 1, 10);
+
+            UPDATE daily_product_sales
+            SET unitsSold = unitsSold - (SELECT SUM(quantity) FROM order_items
+                                         WHERE orderId = NEW.orderId AND productId = daily_product_sales.productId),
+                revenue = revenue - (SELECT SUM(price) FROM order_items
+                                     WHERE orderId = NEW.orderId AND productId = daily_product_sales.productId)
+            WHERE day = substr(OLD.orderDate, 1, 10)
+              AND productId IN (SELECT productId FROM order_items WHERE orderId = NEW.orderId);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_restore_aggregates
+        AFTER UPDATE OF status ON orders WHEN OLD.status = 'Cancelled' AND NEW.status != 'Cancelled'
+        BEGIN
+            INSERT INTO daily_revenue (day, orderCount, revenue)
+            VALUES (substr(NEW.orderDate, 1, 10), 1, NEW.totalAmount)
+            ON CONFLICT (day) DO UPDATE SET
+                orderCount = orderCount + 1,
+                revenue = revenue + excluded.revenue;
+
+            INSERT INTO daily_product_sales (day, productId, unitsSold, revenue)
+            SELECT substr(NEW.orderDate, 1, 10), productId, SUM(quantity), SUM(price)
+            FROM order_items
+            WHERE orderId = NEW.orderId
+            GROUP BY productId
+            ON CONFLICT (day, productId) DO UPDATE SET
+                unitsSold = unitsSold + excluded.unitsSold,
+                revenue = revenue + excluded.revenue;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_total_aggregates
+        AFTER UPDATE OF totalAmount ON orders WHEN OLD.status != 'Cancelled' AND NEW.status != 'Cancelled'
+        BEGIN
+            UPDATE daily_revenue
+            SET revenue = revenue + NEW.totalAmount - OLD.totalAmount
+            WHERE day = substr(NEW.orderDate, 1, 10);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_order_items_insert_aggregates
+        AFTER INSERT ON order_items
+        BEGIN
+            INSERT INTO daily_product_sales (day, productId, unitsSold, revenue)
+            SELECT substr(orderDate, 1, 10), NEW.productId, NEW.quantity, NEW.price
+            FROM orders
+            WHERE orderId = NEW.orderId AND status != 'Cancelled'
+            ON CONFLICT (day, productId) DO UPDATE SET
+                unitsSold = unitsSold + excluded.unitsSold,
+                revenue = revenue + excluded.revenue;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_order_items_delete_aggregates
+        AFTER DELETE ON order_items
+        BEGIN
+            UPDATE daily_product_sales
+            SET unitsSold = unitsSold - OLD.quantity, revenue = revenue - OLD.price
+            WHERE productId = OLD.productId
+              AND day = (SELECT substr(orderDate, 1, 10) FROM orders
+                         WHERE orderId = OLD.orderId AND status != 'Cancelled');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_supply_records_insert_aggregates
+        AFTER INSERT ON supply_records
+        BEGIN
+            INSERT INTO daily_supplier_supply (supplierName, day, recordCount, quantity)
+            VALUES (NEW.supplierName, substr(NEW.supplyDate, 1, 10), 1, NEW.quantity)
+            ON CONFLICT (supplierName, day) DO UPDATE SET
+                recordCount = recordCount + 1,
+                quantity = quantity + excluded.quantity;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_supply_records_delete_aggregates
+        AFTER DELETE ON supply_records
+        BEGIN
+            UPDATE daily_supplier_supply
+            SET recordCount = recordCount - 1, quantity = quantity - OLD.quantity
+            WHERE supplierName = OLD.supplierName AND day = substr(OLD.supplyDate, 1, 10);
+        END
+        ''',
+    ] + LEGACY_AGGREGATE_REBUILD,
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS id_sequences (
+            name TEXT PRIMARY KEY,
+            nextId INTEGER NOT NULL
+        )
+        ''',
+        "INSERT OR IGNORE INTO id_sequences (name, nextId) SELECT 'orders', COALESCE(MAX(orderId), 0) + 1 FROM orders",
+        "INSERT OR IGNORE INTO id_sequences (name, nextId) SELECT 'shipments', COALESCE(MAX(shipmentId), 0) + 1 FROM shipments",
+        "INSERT OR IGNORE INTO id_sequences (name, nextId) SELECT 'suppliers', COALESCE(MAX(supplierId), 0) + 1 FROM suppliers",
+    ],
+    [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5 (
+            name, description, supplierName,
+            content = 'products', content_rowid = 'productId', prefix = '2 3'
+        )
+        ''',
+        "INSERT INTO products_fts (products_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 3.0)')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_insert_fts
+        AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, name, description, supplierName)
+            VALUES (NEW.productId, NEW.name, NEW.description, NEW.supplierName);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_delete_fts
+        AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description, supplierName)
+            VALUES ('delete', OLD.productId, OLD.name, OLD.description, OLD.supplierName);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_update_fts
+        AFTER UPDATE OF productId, name, description, supplierName ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description, supplierName)
+            VALUES ('delete', OLD.productId, OLD.name, OLD.description, OLD.supplierName);
+            INSERT INTO products_fts (rowid, name, description, supplierName)
+            VALUES (NEW.productId, NEW.name, NEW.description, NEW.supplierName);
+        END
+        ''',
+        "INSERT INTO products_fts (products_fts) VALUES ('rebuild')",
+    ],
+    [
+        '''
+        INSERT INTO suppliers (name, contact)
+        SELECT name, '' FROM (
+            SELECT supplierName AS name FROM products WHERE supplierName IS NOT NULL
+            UNION
+            SELECT supplierName FROM supply_records
+        )
+        WHERE name NOT IN (SELECT name FROM suppliers)
+        ORDER BY name
+        ''',
+        '''
+        UPDATE suppliers
+        SET contact = COALESCE((
+            SELECT group_concat(contact, '; ')
+            FROM (
+                SELECT d.contact FROM suppliers d
+                WHERE d.name = suppliers.name AND d.contact != ''
+                GROUP BY d.contact
+                ORDER BY MIN(d.supplierId)
+            )
+        ), '')
+        WHERE supplierId IN (SELECT MIN(supplierId) FROM suppliers GROUP BY name HAVING COUNT(*) > 1)
+        ''',
+        'DELETE FROM suppliers WHERE supplierId NOT IN (SELECT MIN(supplierId) FROM suppliers GROUP BY name)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers (name)',
+        "UPDATE id_sequences SET nextId = MAX(nextId, (SELECT COALESCE(MAX(supplierId), 0) + 1 FROM suppliers)) WHERE name = 'suppliers'",
+
+        'DROP TRIGGER IF EXISTS trg_products_insert_fts',
+        'DROP TRIGGER IF EXISTS trg_products_delete_fts',
+        'DROP TRIGGER IF EXISTS trg_products_update_fts',
+        'DROP TABLE IF EXISTS products_fts',
+        'ALTER TABLE products ADD COLUMN supplierId INTEGER REFERENCES suppliers(supplierId)',
+        '''
+        UPDATE products
+        SET supplierId = s.supplierId
+        FROM suppliers s
+        WHERE s.name = products.supplierName
+        ''',
+        'ALTER TABLE products DROP COLUMN supplierName',
+        'CREATE INDEX IF NOT EXISTS idx_products_supplier ON products (supplierId)',
+
+        '''
+        CREATE TABLE supply_records_new (
+            recordId INTEGER PRIMARY KEY AUTOINCREMENT,
+            productId INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            supplierId INTEGER NOT NULL,
+            supplyDate TEXT NOT NULL,
+            FOREIGN KEY (productId) REFERENCES products(productId),
+            FOREIGN KEY (supplierId) REFERENCES suppliers(supplierId)
+        )
+        ''',
+        '''
+        INSERT INTO supply_records_new (recordId, productId, quantity, supplierId, supplyDate)
+        SELECT r.recordId, r.productId, r.quantity, s.supplierId, r.supplyDate
+        FROM supply_records r
+        JOIN suppliers s ON s.name = r.supplierName
+        ''',
+        'DROP TABLE supply_records',
+        'ALTER TABLE supply_records_new RENAME TO supply_records',
+        'CREATE INDEX IF NOT EXISTS idx_supply_records_product ON supply_records (productId)',
+        'CREATE INDEX IF NOT EXISTS idx_supply_records_date ON supply_records (supplyDate)',
+        'CREATE INDEX IF NOT EXISTS idx_supply_records_supplier ON supply_records (supplierId, supplyDate)',
+
+        'DROP TABLE daily_supplier_supply',
+        '''
+        CREATE TABLE daily_supplier_supply (
+            supplierId INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            recordCount INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (supplierId, day)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_daily_supplier_supply_day ON daily_supplier_supply (day)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_supply_records_insert_aggregates
+        AFTER INSERT ON supply_records
+        BEGIN
+            INSERT INTO daily_supplier_supply (supplierId, day, recordCount, quantity)
+            VALUES (NEW.supplierId, substr(NEW.supplyDate, 1, 10), 1, NEW.quantity)
+            ON CONFLICT (supplierId, day) DO UPDATE SET
+                recordCount = recordCount + 1,
+                quantity = quantity + excluded.quantity;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_supply_records_delete_aggregates
+        AFTER DELETE ON supply_records
+        BEGIN
+            UPDATE daily_supplier_supply
+            SET recordCount = recordCount - 1, quantity = quantity - OLD.quantity
+            WHERE supplierId = OLD.supplierId AND day = substr(OLD.supplyDate, 1, 10);
+        END
+        ''',
+
+        '''
+        CREATE VIEW IF NOT EXISTS products_search AS
+        SELECT p.productId, p.name, p.description, s.name AS supplierName
+        FROM products p
+        LEFT JOIN suppliers s ON s.supplierId = p.supplierId
+        ''',
+        '''
+        CREATE VIRTUAL TABLE products_fts USING fts5 (
+            name, description, supplierName,
+            content = 'products_search', content_rowid = 'productId', prefix = '2 3'
+        )
+        ''',
+        "INSERT INTO products_fts (products_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 3.0)')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_insert_fts
+        AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, name, description, supplierName)
+            VALUES (NEW.productId, NEW.name, NEW.description,
+                    (SELECT name FROM suppliers WHERE supplierId = NEW.supplierId));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_delete_fts
+        AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description, supplierName)
+            VALUES ('delete', OLD.productId, OLD.name, OLD.description,
+                    (SELECT name FROM suppliers WHERE supplierId = OLD.supplierId));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_update_fts
+        AFTER UPDATE OF productId, name, description, supplierId ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description, supplierName)
+            VALUES ('delete', OLD.productId, OLD.name, OLD.description,
+                    (SELECT name FROM suppliers WHERE supplierId = OLD.supplierId));
+            INSERT INTO products_fts (rowid, name, description, supplierName)
+            VALUES (NEW.productId, NEW.name, NEW.description,
+                    (SELECT name FROM suppliers WHERE supplierId = NEW.supplierId));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_update_fts
+        AFTER UPDATE OF name ON suppliers WHEN OLD.name != NEW.name
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, description, supplierName)
+            SELECT 'delete', productId, name, description, OLD.name FROM products WHERE supplierId = OLD.supplierId;
+            INSERT INTO products_fts (rowid, name, description, supplierName)
+            SELECT productId, name, description, NEW.name FROM products WHERE supplierId = NEW.supplierId;
+        END
+        ''',
+        "INSERT INTO products_fts (products_fts) VALUES ('rebuild')",
+    ] + SUPPLY_AGGREGATE_REBUILD,
+]
+
+PRODUCT_SELECT = '''
+SELECT p.productId, p.name, p.description, p.price, p.stockQuantity, s.name AS supplierName
+FROM products p
+LEFT JOIN suppliers s ON s.supplierId = p.supplierId
+'''
+
+SUPPLY_RECORD_SELECT = '''
+SELECT r.recordId, r.productId, p.name AS productName, r.quantity, s.name AS supplierName, r.supplyDate
+FROM supply_records r
+LEFT JOIN products p ON p.productId = r.productId
+JOIN suppliers s ON s.supplierId = r.supplierId
+'''
+
+ID_SEQUENCES = {
+    'orders': ('orders', 'orderId'),
+    'shipments': ('shipments', 'shipmentId'),
+    'suppliers': ('suppliers', 'supplierId'),
+}
+
+POOL_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'busy_timeout': 5000,
+}
+
+SHIPMENT_TRANSITIONS = {
+    'Pending': {'Shipped', 'Cancelled'},
+    'Shipped': {'Delivered'},
+    'Delivered': set(),
+    'Cancelled': set(),
+}
+
+# Shipment statuses that carry over to the shipment's order. Orders move to 'Shipped' when
+# a shipment ships and to 'Delivered' when it is delivered; before batch status updates,
+# shipping never touched the order's status.
+SHIPMENT_ORDER_STATUS = {
+    'Shipped': 'Shipped',
+    'Delivered': 'Delivered',
+}
+
+_ROW_CLASSES = {}
+
+def _make_row_class(fields: Tuple[str, ...]):
+    index = {name: position for position, name in enumerate(fields)}
+
+    class Row(namedtuple('Row', fields, rename=True)):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return tuple.__getitem__(self, index[key])
+            return tuple.__getitem__(self, key)
+
+        def get(self, key: str, default: Any = None) -> Any:
+            return self[key] if key in index else default
+
+        def keys(self) -> Tuple[str, ...]:
+            return fields
+
+    return Row
+
+def compact_row_factory(cursor: sqlite3.Cursor, row: Tuple) -> Tuple:
+    description = cursor.description
+    row_class = _ROW_CLASSES.get(description)
+    if row_class is None:
+        row_class = _ROW_CLASSES[description] = _make_row_class(tuple(column[0] for column in description))
+    return row_class(*row)
+
+def _reads(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.pooled and getattr(self._local, 'conn', None) is None:
+            with self.connection():
+                return method(self, *args, **kwargs)
+        if self.pooled or self.group_commit_ms is None:
+            return method(self, *args, **kwargs)
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    wrapper.access = 'read'
+    return wrapper
+
+def _reports(method):
+    reads = _reads(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        reader = None
+        if self._snapshot is not None and getattr(self._local, 'conn', None) is None:
+            reader = self._snapshot_reader()
+        if reader is None:
+            return reads(self, *args, **kwargs)
+        with self._reading_from(reader.conn):
+            return method(self, *args, **kwargs)
+    wrapper.access = 'read'
+    return wrapper
+
+class _SnapshotReader:
+    def __init__(self, conn: sqlite3.Connection, generation: int):
+        self.conn = conn
+        self.generation = generation
+        self.pins = 0
+
+def _writes(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.pooled and getattr(self._local, 'conn', None) is not self._writer:
+            with self.connection(write=True):
+                return method(self, *args, **kwargs)
+        if self.group_commit_ms is None:
+            return method(self, *args, **kwargs)
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    wrapper.access = 'write'
+    return wrapper
 
 class Database:
-    def __init__(self, db_name: str = "warehouse.db"):
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name: str = "warehouse.db", pooled: bool = False, readers: int = 4,
+                 compact_rows: bool = False, group_commit_ms: Optional[float] = None,
+                 group_commit_ops: int = 100):
+        if pooled and db_name == ":memory:":
+            raise ValueError("Pooled mode needs a database file, not ':memory:'")
+        if group_commit_ms is not None and (group_commit_ms <= 0 or group_commit_ops <= 0):
+            raise ValueError("Group commit window and operation count must be positive")
+
+        self.db_name = db_name
+        self.pooled = pooled
+        self.compact_rows = compact_rows
+        self.group_commit_ms = None
+        self.group_commit_ops = group_commit_ops
+        self._pending_writes = 0
+        self._first_pending = 0.0
+        self._savepoint = False
+        self._stop_flushing = threading.Event()
+        self._flusher = None
+        self._snapshot = None
+        self._snapshot_path = None
+        self._snapshot_taken = None
+        self._snapshot_uri = None
+        self._snapshot_generation = 0
+        self._snapshot_readers = set()
+        self._snapshot_lock = threading.RLock()
+        self._stop_refreshing = threading.Event()
+        self._refresher = None
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._readers = queue.Queue()
+        self._all_readers = []
+
+        if pooled:
+            self._writer = self._connect()
+            self._writer.execute('PRAGMA journal_mode = WAL')
+        else:
+            self._writer = sqlite3.connect(db_name, check_same_thread=group_commit_ms is None)
+        if compact_rows:
+            self._writer.row_factory = compact_row_factory
+
         self.create_tables()
 
+        if pooled:
+            for _ in range(readers):
+                reader = self._connect()
+                reader.execute('PRAGMA query_only = ON')
+                reader.row_factory = self._writer.row_factory
+                self._all_readers.append(reader)
+                self._readers.put(reader)
+
+        if group_commit_ms is not None:
+            self.group_commit_ms = group_commit_ms
+            self._flusher = threading.Thread(target=self._flush_loop, name="db-group-commit", daemon=True)
+            self._flusher.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for pragma, value in POOL_PRAGMAS.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def open_connections(self) -> List[sqlite3.Connection]:
+        return [self._writer] + self._all_readers
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return getattr(self._local, 'conn', None) or self._writer
+
+    @contextmanager
+    def connection(self, write: bool = False):
+        current = getattr(self._local, 'conn', None)
+        if not self.pooled or current is self._writer or (current is not None and not write):
+            yield self.conn
+            return
+
+        if write:
+            with self._write_lock:
+                self._local.conn = self._writer
+                try:
+                    yield self._writer
+                finally:
+                    self._local.conn = current
+        else:
+            reader = self._readers.get()
+            self._local.conn = reader
+            try:
+                yield reader
+            finally:
+                self._local.conn = None
+                self._readers.put(reader)
+
+    # Group commit: with group_commit_ms set, write methods leave their changes in one open
+    # transaction that is committed every group_commit_ms milliseconds, after group_commit_ops
+    # writes, on flush() and on close(). A crash or power loss can drop up to one window of
+    # writes that already returned, and in pooled mode readers only see them once committed.
+    # Multi-statement writes run inside a savepoint, so a failed call still rolls back alone.
+    def _begin(self):
+        if self.group_commit_ms is None:
+            self.conn.execute("BEGIN TRANSACTION")
+            return
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self.conn.execute("SAVEPOINT group_write")
+        self._savepoint = True
+
+    def _commit(self):
+        if self.group_commit_ms is None:
+            self.conn.commit()
+            return
+        if self._savepoint:
+            self.conn.execute("RELEASE group_write")
+            self._savepoint = False
+        if self._pending_writes == 0:
+            self._first_pending = time.monotonic()
+        self._pending_writes += 1
+        if (self._pending_writes >= self.group_commit_ops
+                or (time.monotonic() - self._first_pending) * 1000 >= self.group_commit_ms):
+            self.flush()
+
+    def _rollback(self):
+        if self.group_commit_ms is None or not self._savepoint:
+            self.conn.rollback()
+            return
+        self.conn.execute("ROLLBACK TO group_write")
+        self.conn.execute("RELEASE group_write")
+        self._savepoint = False
+
+    @_writes
+    def flush(self) -> int:
+        flushed = self._pending_writes
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self._pending_writes = 0
+        return flushed
+
+    def _flush_loop(self):
+        while not self._stop_flushing.wait(self.group_commit_ms / 1000):
+            try:
+                self.flush()
+            except sqlite3.OperationalError:
+                continue
+
+    # Snapshot reads: with snapshots enabled, listing and report methods (@_reports) read from a
+    # point-in-time copy made with the backup API, so they never wait on or see half of a write.
+    # Point lookups and everything inside a write still use the live database. Each thread reads
+    # the snapshot through its own connection, and a paged iterator keeps the snapshot it started
+    # on until it is exhausted or closed, even if a refresh lands in between. Without a path the
+    # snapshot is a shared-cache in-memory database that lives as long as one of them is open.
+    def enable_snapshots(self, path: Optional[str] = None, refresh_seconds: Optional[float] = None):
+        if refresh_seconds is not None and refresh_seconds <= 0:
+            raise ValueError("Snapshot refresh interval must be positive")
+        if refresh_seconds is not None and self.db_name == ":memory:":
+            raise ValueError("Scheduled snapshot refresh needs a database file, not ':memory:'")
+
+        self.disable_snapshots()
+        self._snapshot_path = path
+        self._take_snapshot()
+        if refresh_seconds is not None:
+            self._stop_refreshing.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, args=(refresh_seconds,),
+                                               name="db-snapshot", daemon=True)
+            self._refresher.start()
+
+    def refresh_snapshot(self):
+        if self._snapshot is None:
+            raise ValueError("Snapshots are not enabled; call enable_snapshots() first")
+        self._take_snapshot()
+
+    def _take_snapshot(self):
+        generation = self._snapshot_generation + 1
+        if self._snapshot_path:
+            staging, uri = f"{self._snapshot_path}.tmp", self._snapshot_path
+        else:
+            staging = uri = f"file:db-snapshot-{id(self)}-{generation}?mode=memory&cache=shared"
+        source = self._writer if self.db_name == ":memory:" else sqlite3.connect(self.db_name)
+        target = sqlite3.connect(staging, uri=True, check_same_thread=False)
+        try:
+            source.backup(target)
+        finally:
+            if source is not self._writer:
+                source.close()
+
+        with self._snapshot_lock:
+            previous = self._snapshot
+            if self._snapshot_path:
+                target.close()
+                if previous is not None:
+                    previous.close()
+                    previous = None
+                os.replace(staging, self._snapshot_path)
+                target = self._open_snapshot(uri)
+            else:
+                target.execute('PRAGMA query_only = ON')
+            self._snapshot = target
+            self._snapshot_uri = uri
+            self._snapshot_generation = generation
+            self._snapshot_taken = time.time()
+        if previous is not None:
+            previous.close()
+
+    def _open_snapshot(self, uri: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute('PRAGMA query_only = ON')
+        conn.row_factory = self._writer.row_factory
+        return conn
+
+    def _snapshot_reader(self, pin: bool = False) -> Optional[_SnapshotReader]:
+        with self._snapshot_lock:
+            if self._snapshot is None:
+                return None
+            reader = getattr(self._local, 'snapshot', None)
+            if reader is None or reader.generation != self._snapshot_generation:
+                if reader is not None:
+                    self._close_idle_reader(reader)
+                reader = _SnapshotReader(self._open_snapshot(self._snapshot_uri), self._snapshot_generation)
+                self._snapshot_readers.add(reader)
+                self._local.snapshot = reader
+            if pin:
+                reader.pins += 1
+            return reader
+
+    def _unpin_snapshot(self, reader: _SnapshotReader):
+        with self._snapshot_lock:
+            reader.pins -= 1
+            self._close_idle_reader(reader)
+
+    def _close_idle_reader(self, reader: _SnapshotReader):
+        if reader.pins == 0 and reader.generation != self._snapshot_generation and reader in self._snapshot_readers:
+            self._snapshot_readers.discard(reader)
+            reader.conn.close()
+
+    @contextmanager
+    def _reading_from(self, conn: sqlite3.Connection):
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+
+    def _refresh_loop(self, refresh_seconds: float):
+        while not self._stop_refreshing.wait(refresh_seconds):
+            try:
+                self.refresh_snapshot()
+            except sqlite3.OperationalError:
+                continue
+
+    def snapshot_age(self) -> Optional[float]:
+        return time.time() - self._snapshot_taken if self._snapshot is not None else None
+
+    def disable_snapshots(self):
+        if self._refresher is not None:
+            self._stop_refreshing.set()
+            self._refresher.join()
+            self._refresher = None
+        with self._snapshot_lock:
+            for reader in self._snapshot_readers:
+                reader.conn.close()
+            self._snapshot_readers.clear()
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = None
+            self._snapshot_uri = None
+            self._snapshot_taken = None
+
+    @_writes
     def create_tables(self):
         cursor = self.conn.cursor()
         
@@ -71,51 +850,175 @@ class Database:
             FOREIGN KEY (productId) REFERENCES products(productId)
         )
         ''')
-        
+
         self.conn.commit()
+        self.migrate()
+
+    @_reads
+    def get_schema_version(self) -> int:
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+
+    @_writes
+    def migrate(self):
+        current_version = self.get_schema_version()
+
+        for version, statements in enumerate(MIGRATIONS, start=1):
+            if version <= current_version:
+                continue
+            try:
+                self.conn.execute("BEGIN TRANSACTION")
+                for statement in statements:
+                    self.conn.execute(statement)
+                self.conn.execute(f'PRAGMA user_version = {version}')
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise e
 
+    @_reads
+    def explain_query_plan(self, query: str, params: Tuple = ()) -> List[str]:
+        cursor = self.conn.cursor()
+        cursor.execute(f'EXPLAIN QUERY PLAN {query}', params)
+        return [row[3] for row in cursor.fetchall()]
+
+    @_writes
     def add_product(self, product: Dict[str, Any]):
         cursor = self.conn.cursor()
-        cursor.execute('''
-        INSERT INTO products (productId, name, description, price, stockQuantity, supplierName)
+        try:
+            self._begin()
+            supplier_ids = self._supplier_ids(cursor, [product.get('supplierName')])
+            cursor.execute('''
+            INSERT INTO products (productId, name, description, price, stockQuantity, supplierId)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (product['productId'], product['name'], product['description'],
+                  product['price'], product['stockQuantity'], supplier_ids.get(product.get('supplierName'))))
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    @_writes
+    def add_products(self, products: List[Dict[str, Any]], upsert: bool = False) -> int:
+        cursor = self.conn.cursor()
+        query = '''
+        INSERT INTO products (productId, name, description, price, stockQuantity, supplierId)
         VALUES (?, ?, ?, ?, ?, ?)
-        ''', (product['productId'], product['name'], product['description'], 
-              product['price'], product['stockQuantity'], product.get('supplierName', None)))
-        self.conn.commit()
+        '''
+        if upsert:
+            query += '''
+            ON CONFLICT (productId) DO UPDATE SET
+                name = excluded.name,
+                description = excluded.description,
+                price = excluded.price,
+                stockQuantity = excluded.stockQuantity,
+                supplierId = excluded.supplierId
+            '''
+        try:
+            self._begin()
+            supplier_ids = self._supplier_ids(cursor, [product.get('supplierName') for product in products])
+            cursor.executemany(query, [(product['productId'], product['name'], product['description'],
+                                        product['price'], product['stockQuantity'],
+                                        supplier_ids.get(product.get('supplierName')))
+                                       for product in products])
+            self._commit()
+            return cursor.rowcount
+        except Exception as e:
+            self._rollback()
+            raise e
 
+    @_reads
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        cursor = self.conn.cursor()
+        cursor.execute(PRODUCT_SELECT + 'WHERE p.productId = ?', (product_id,))
+        return self._fetch_row(cursor)
+
+    @_reads
+    def product_exists(self, product_id: int) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT 1 FROM products WHERE productId = ?', (product_id,))
+        return cursor.fetchone() is not None
+
+    @_reads
+    def search_products(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        terms = re.findall(r'\w+', text)
+        if not terms or limit <= 0:
+            return []
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT p.productId, p.name, p.description, p.price, p.stockQuantity, s.name AS supplierName
+        FROM products_fts
+        JOIN products p ON p.productId = products_fts.rowid
+        LEFT JOIN suppliers s ON s.supplierId = p.supplierId
+        WHERE products_fts MATCH ?
+        ORDER BY products_fts.rank
+        LIMIT ?
+        ''', (' '.join(f'"{term}"*' if len(term) > 1 else f'"{term}"' for term in terms), limit))
+        return self._fetch_rows(cursor)
+
+    @_reports
     def get_all_products(self) -> List[Dict[str, Any]]:
       cursor = self.conn.cursor()
-      cursor.execute('SELECT * FROM products')
-      columns = [column[0] for column in cursor.description]
-      return [dict(zip(columns, row)) for row in cursor.fetchall()]
+      cursor.execute(PRODUCT_SELECT)
+      return self._fetch_rows(cursor)
     
+    @_reads
     def get_max_order_id(self):
       cursor = self.conn.cursor()
       cursor.execute('SELECT MAX(orderId) FROM orders')
       result = cursor.fetchone()[0]
       return result if result is not None else 0
 
+    @_writes
+    def reserve_ids(self, name: str, count: int) -> range:
+        if name not in ID_SEQUENCES:
+            raise ValueError(f"Unknown ID sequence '{name}'")
+        if count <= 0:
+            raise ValueError("Count must be positive")
+
+        cursor = self.conn.cursor()
+        try:
+            self._begin()
+            ids = self._reserve_ids(cursor, name, count)
+            self._commit()
+            self.flush()
+            return ids
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    def _reserve_ids(self, cursor, name: str, count: int) -> range:
+        table, column = ID_SEQUENCES[name]
+        cursor.execute(f'''
+        UPDATE id_sequences
+        SET nextId = MAX(nextId, (SELECT COALESCE(MAX({column}), 0) + 1 FROM {table})) + ?
+        WHERE name = ?
+        RETURNING nextId
+        ''', (count, name))
+        end = cursor.fetchall()[0][0]
+        return range(end - count, end)
+
+    @_reads
     def get_max_shipment_id(self):
         cursor = self.conn.cursor()
         cursor.execute('SELECT MAX(shipmentId) FROM shipments')
         result = cursor.fetchone()[0]
         return result if result is not None else 0
 
+    @_reads
     def get_max_supplier_id(self):
         cursor = self.conn.cursor()
         cursor.execute('SELECT MAX(supplierId) FROM suppliers')
         result = cursor.fetchone()[0]
         return result if result is not None else 0
       
+    @_reads
     def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
       cursor = self.conn.cursor()
       cursor.execute('SELECT * FROM orders WHERE orderId = ?', (order_id,))
-      row = cursor.fetchone()
-      if row:
-          columns = [column[0] for column in cursor.description]
-          return dict(zip(columns, row))
-      return None
+      return self._fetch_row(cursor)
     
+    @_reads
     def get_shipment(self, shipment_id: int) -> Optional[Dict[str, Any]]:
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -130,12 +1033,9 @@ class Database:
       JOIN orders o ON s.orderId = o.orderId
       WHERE s.shipmentId = ?
       ''', (shipment_id,))
-      row = cursor.fetchone()
-      if row:
-          columns = [column[0] for column in cursor.description]
-          return dict(zip(columns, row))
-      return None
+      return self._fetch_row(cursor)
 
+    @_writes
     def update_shipment_status(self, shipment_id: int, new_status: str):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -143,18 +1043,92 @@ class Database:
         SET status = ?
         WHERE shipmentId = ?
         ''', (new_status, shipment_id))
-        self.conn.commit()
+        self._commit()
         
+    @_writes
+    # Results are keyed by shipment id, so a shipment listed more than once in one batch is
+    # rejected as a whole rather than applying whichever of its updates came last.
+    def update_shipment_statuses(self, updates: List[Tuple[int, str]]) -> Dict[str, Any]:
+        cursor = self.conn.cursor()
+        rejected = {}
+        requested = []
+        repeated = {shipment_id for shipment_id, count in Counter(
+            shipment_id for shipment_id, _ in updates).items() if count > 1}
+
+        try:
+            self._begin()
+
+            current = {row[0]: (row[1], row[2]) for row in self._select_in(
+                cursor, 'SELECT shipmentId, orderId, status FROM shipments WHERE shipmentId IN ({})',
+                {shipment_id for shipment_id, _ in updates})}
+            statuses = {shipment_id: status for shipment_id, (_, status) in current.items()}
+
+            for shipment_id, status in updates:
+                if shipment_id in repeated:
+                    rejected[shipment_id] = f"Shipment {shipment_id} is listed more than once"
+                    continue
+                if not self.is_valid_shipment_status(status):
+                    rejected[shipment_id] = f"Invalid shipment status '{status}'"
+                    continue
+                if shipment_id not in statuses:
+                    rejected[shipment_id] = f"Shipment {shipment_id} not found"
+                    continue
+                status = status.capitalize()
+                if status != statuses[shipment_id]:
+                    if status not in SHIPMENT_TRANSITIONS[statuses[shipment_id]]:
+                        rejected[shipment_id] = f"Cannot change shipment {shipment_id} from {statuses[shipment_id]} to {status}"
+                        continue
+                    statuses[shipment_id] = status
+                requested.append(shipment_id)
+
+            updated = [shipment_id for shipment_id, status in statuses.items() if status != current[shipment_id][1]]
+            unchanged = [shipment_id for shipment_id in requested if shipment_id not in updated]
+
+            order_statuses = {}
+            ranks = list(SHIPMENT_ORDER_STATUS.values())
+            for shipment_id in updated:
+                order_status = SHIPMENT_ORDER_STATUS.get(statuses[shipment_id])
+                order_id = current[shipment_id][0]
+                if order_status and ranks.index(order_status) >= ranks.index(order_statuses.get(order_id, ranks[0])):
+                    order_statuses[order_id] = order_status
+
+            self._update_from_values(cursor, '''
+            UPDATE shipments
+            SET status = v.column2
+            FROM (VALUES {}) AS v
+            WHERE shipments.shipmentId = v.column1
+            ''', [(shipment_id, statuses[shipment_id]) for shipment_id in updated])
+
+            orders_updated = [row[0] for row in self._update_from_values(cursor, '''
+            UPDATE orders
+            SET status = v.column2
+            FROM (VALUES {}) AS v
+            WHERE orders.orderId = v.column1
+              AND orders.status NOT IN ('Cancelled', 'Delivered')
+              AND orders.status != v.column2
+            RETURNING orders.orderId
+            ''', list(order_statuses.items()))]
+
+            self._commit()
+            return {'updated': updated, 'unchanged': unchanged, 'rejected': rejected,
+                    'orders_updated': orders_updated}
+
+        except Exception as e:
+            self._rollback()
+            raise e
+
     def is_valid_shipment_status(self, status: str) -> bool:
       valid_statuses = ["Pending", "Shipped", "Delivered", "Cancelled"]
       return status.capitalize() in valid_statuses
     
+    @_reads
     def get_shipment_status(self, shipment_id: int) -> Optional[str]:
       cursor = self.conn.cursor()
       cursor.execute('SELECT status FROM shipments WHERE shipmentId = ?', (shipment_id,))
       result = cursor.fetchone()
       return result[0] if result else None
     
+    @_writes
     def remove_product(self, product_id: int):
       cursor = self.conn.cursor()
       
@@ -163,10 +1137,11 @@ class Database:
           raise ValueError(f"Product with ID {product_id} does not exist")
       
       cursor.execute('DELETE FROM products WHERE productId = ?', (product_id,))
-      self.conn.commit()
+      self._commit()
       
       self._cleanup_after_product_deletion(product_id)
 
+    @_writes
     def _cleanup_after_product_deletion(self, product_id: int):
         cursor = self.conn.cursor()
         
@@ -174,14 +1149,14 @@ class Database:
         
         cursor.execute('DELETE FROM supply_records WHERE productId = ?', (product_id,))
         
-        self.conn.commit()
+        self._commit()
     
+    @_writes
     def cancel_order(self, order_id: int, update_memory: bool = False):
       cursor = self.conn.cursor()
-      returned_quantities = {}
       
       try:
-          self.conn.execute("BEGIN TRANSACTION")
+          self._begin()
           
           cursor.execute('SELECT status FROM orders WHERE orderId = ?', (order_id,))
           result = cursor.fetchone()
@@ -194,40 +1169,129 @@ class Database:
           if current_status == "Cancelled":
               raise ValueError(f"Order {order_id} is already cancelled")
               
-          if current_status == "Shipped":
-              raise ValueError(f"Cannot cancel shipped order {order_id}")
+          if current_status in ("Shipped", "Delivered"):
+              raise ValueError(f"Cannot cancel {current_status.lower()} order {order_id}")
           
-          cursor.execute('''
-          SELECT productId, quantity 
-          FROM order_items 
-          WHERE orderId = ?
-          ''', (order_id,))
-          items = cursor.fetchall()
-          
-          if not items:
+          cursor.execute('SELECT 1 FROM order_items WHERE orderId = ? LIMIT 1', (order_id,))
+          if not cursor.fetchone():
               raise ValueError(f"No items found for order {order_id}")
           
-          for product_id, quantity in items:
-              cursor.execute('''
-              UPDATE products 
-              SET stockQuantity = stockQuantity + ?
-              WHERE productId = ?
-              ''', (quantity, product_id))
-              returned_quantities[product_id] = quantity
-          
-          cursor.execute('''
-          UPDATE orders 
-          SET status = 'Cancelled'
-          WHERE orderId = ?
-          ''', (order_id,))
+          returned_quantities = self._cancel_and_restock(cursor, [order_id])
           
-          self.conn.commit()
+          self._commit()
           return returned_quantities if update_memory else None
           
       except Exception as e:
-          self.conn.rollback()
+          self._rollback()
           raise e
 
+    @_writes
+    def cancel_orders(self, order_ids: List[int]) -> Dict[str, Any]:
+        cursor = self.conn.cursor()
+        order_ids = list(dict.fromkeys(order_ids))
+        rejected = {}
+
+        try:
+            self._begin()
+
+            statuses = dict(self._select_in(
+                cursor, 'SELECT orderId, status FROM orders WHERE orderId IN ({})', order_ids))
+            with_items = {row[0] for row in self._select_in(
+                cursor, 'SELECT DISTINCT orderId FROM order_items WHERE orderId IN ({})', order_ids)}
+
+            for order_id in order_ids:
+                if order_id not in statuses:
+                    rejected[order_id] = f"Order {order_id} not found"
+                elif statuses[order_id] == "Cancelled":
+                    rejected[order_id] = f"Order {order_id} is already cancelled"
+                elif statuses[order_id] in ("Shipped", "Delivered"):
+                    rejected[order_id] = f"Cannot cancel {statuses[order_id].lower()} order {order_id}"
+                elif order_id not in with_items:
+                    rejected[order_id] = f"No items found for order {order_id}"
+
+            cancelled = [order_id for order_id in order_ids if order_id not in rejected]
+            restocked = self._cancel_and_restock(cursor, cancelled)
+
+            self._commit()
+            return {'cancelled': cancelled, 'rejected': rejected, 'restocked': restocked}
+
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    # Only 'Pending' orders are swept unless the caller opts in to other open statuses, such as
+    # the 'Placed' state every order the app creates is in.
+    def expire_pending_orders(self, older_than_days: int, chunk_size: int = 500,
+                              statuses: Tuple[str, ...] = ('Pending',)) -> Dict[str, Any]:
+        if older_than_days < 0:
+            raise ValueError("older_than_days must not be negative")
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        if not statuses or any(status in ('Shipped', 'Delivered', 'Cancelled') for status in statuses):
+            raise ValueError("Only open (unshipped) order statuses can be expired")
+
+        cutoff = str(date.today() - timedelta(days=older_than_days))
+        expired = []
+        restocked = {}
+        while True:
+            chunk, chunk_restocked = self._expire_pending_chunk(cutoff, chunk_size, tuple(statuses))
+            expired.extend(chunk)
+            for product_id, quantity in chunk_restocked.items():
+                restocked[product_id] = restocked.get(product_id, 0) + quantity
+            if len(chunk) < chunk_size:
+                return {'expired': expired, 'restocked': restocked}
+
+    @_writes
+    def _expire_pending_chunk(self, cutoff: str, chunk_size: int,
+                              statuses: Tuple[str, ...]) -> Tuple[List[int], Dict[int, int]]:
+        cursor = self.conn.cursor()
+        try:
+            self._begin()
+            cursor.execute(f'''
+            SELECT orderId FROM orders
+            WHERE orderDate < ? AND status IN ({', '.join('?' * len(statuses))})
+            ORDER BY orderDate
+            LIMIT ?
+            ''', (cutoff, *statuses, chunk_size))
+            order_ids = [row[0] for row in cursor.fetchall()]
+            restocked = self._cancel_and_restock(cursor, order_ids)
+            self._commit()
+            return order_ids, restocked
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    def _cancel_and_restock(self, cursor, order_ids: List[int], chunk_size: int = 500) -> Dict[int, int]:
+        restocked = {}
+        for start in range(0, len(order_ids), chunk_size):
+            chunk = order_ids[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            grouped_items = f'''
+            SELECT productId, SUM(quantity) AS quantity
+            FROM order_items
+            WHERE orderId IN ({placeholders})
+            GROUP BY productId
+            '''
+
+            cursor.execute(grouped_items, chunk)
+            for product_id, quantity in cursor.fetchall():
+                restocked[product_id] = restocked.get(product_id, 0) + quantity
+
+            cursor.execute(f'''
+            UPDATE products
+            SET stockQuantity = stockQuantity + returned.quantity
+            FROM ({grouped_items}) AS returned
+            WHERE products.productId = returned.productId
+            ''', chunk)
+
+            cursor.execute(f'''
+            UPDATE orders
+            SET status = 'Cancelled'
+            WHERE orderId IN ({placeholders})
+            ''', chunk)
+        return restocked
+
+    @_reads
     def get_order_items_with_products(self, order_id: int):
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -255,6 +1319,7 @@ class Database:
     #         WHERE productId = ?
     #         ''', (quantity, product_id))
     
+    @_reads
     def get_shipment_details(self, shipment_id: int) -> Optional[Dict[str, Any]]:
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -267,18 +1332,16 @@ class Database:
       JOIN orders o ON s.orderId = o.orderId
       WHERE s.shipmentId = ?
       ''', (shipment_id,))
-      row = cursor.fetchone()
-      if row:
-          columns = [column[0] for column in cursor.description]
-          return dict(zip(columns, row))
-      return None
+      return self._fetch_row(cursor)
     
+    @_reads
     def get_order_status(self, order_id: int) -> Optional[str]:
       cursor = self.conn.cursor()
       cursor.execute('SELECT status FROM orders WHERE orderId = ?', (order_id,))
       result = cursor.fetchone()
       return result[0] if result else None
 
+    @_reads
     def get_order_items(self, order_id: int) -> List[Dict[str, Any]]:
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -287,28 +1350,15 @@ class Database:
         JOIN products p ON oi.productId = p.productId
         WHERE oi.orderId = ?
         ''', (order_id,))
-        columns = [column[0] for column in cursor.description]
-        rows = cursor.fetchall()
-        result = []
-        
-        for row in rows:
-          item = dict(zip(columns,row))
-          result.append(item)
-        return result
+        return self._fetch_rows(cursor)
 
+    @_reports
     def get_all_orders(self) -> List[Dict[str, Any]]:
         cursor = self.conn.cursor()
         cursor.execute('SELECT * FROM orders ORDER BY orderDate DESC')
-        columns = [column[0] for column in cursor.description]
-        rows = cursor.fetchall()
-        result = []
-        
-        for row in rows:
-          item = dict(zip(columns,row))
-          result.append(item)
-        return result
-        # return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self._fetch_rows(cursor)
       
+    @_reports
     def get_all_shipments(self) -> List[Dict[str, Any]]:
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -324,15 +1374,9 @@ class Database:
       JOIN orders o ON s.orderId = o.orderId
       ORDER BY s.shipmentDate DESC
       ''')
-      columns = [column[0] for column in cursor.description]
-      rows = cursor.fetchall()
-      result = []
-        
-      for row in rows:
-        item = dict(zip(columns,row))
-        result.append(item)
-      return result
+      return self._fetch_rows(cursor)
 
+    @_writes
     def update_product_stock(self, productId: int, quantity: int):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -340,8 +1384,9 @@ class Database:
         SET stockQuantity = stockQuantity + ? 
         WHERE productId = ?
         ''', (quantity, productId))
-        self.conn.commit()
+        self._commit()
       
+    @_writes
     def update_order_status(self, order_id: int, new_status: str):
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -349,8 +1394,9 @@ class Database:
       SET status = ?
       WHERE orderId = ?
       ''', (new_status, order_id))
-      self.conn.commit()
+      self._commit()
 
+    @_writes
     def add_shipment(self, shipment_data: Dict[str, Any]):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -358,16 +1404,73 @@ class Database:
         VALUES (?, ?, ?, ?)
         ''', (shipment_data['shipmentId'], shipment_data['orderId'],
               shipment_data['shipmentDate'], shipment_data['status']))
-        self.conn.commit()
+        self._commit()
 
+    @_writes
     def add_supplier(self, supplier: Dict[str, Any]):
         cursor = self.conn.cursor()
         cursor.execute('''
         INSERT INTO suppliers (supplierId, name, contact)
         VALUES (?, ?, ?)
         ''', (supplier['supplierId'], supplier['name'], supplier['contact']))
-        self.conn.commit()
+        self._commit()
+
+    # Suppliers are unique by name. Products and supply records reference them by supplierId
+    # and are written with a supplier name, which is looked up through idx_suppliers_name
+    # and registered with an empty contact, and an id from the 'suppliers' sequence, the
+    # first time it is seen.
+    @_reads
+    def get_supplier_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT * FROM suppliers WHERE name = ?', (name,))
+        return self._fetch_row(cursor)
+
+    @_writes
+    def upsert_supplier(self, name: str, contact: Optional[str] = None) -> int:
+        cursor = self.conn.cursor()
+        try:
+            self._begin()
+            supplier_id = self._supplier_ids(cursor, [name])[name]
+            if contact:
+                cursor.execute('UPDATE suppliers SET contact = ? WHERE supplierId = ?', (contact, supplier_id))
+            self._commit()
+            return supplier_id
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    def _supplier_ids(self, cursor, names) -> Dict[str, int]:
+        names = {name for name in names if name is not None}
+        if not names:
+            return {}
+        query = 'SELECT name, supplierId FROM suppliers WHERE name IN ({})'
+        ids = dict(tuple(row) for row in self._select_in(cursor, query, names))
+        missing = sorted(names - ids.keys())
+        if missing:
+            cursor.executemany('''
+            INSERT INTO suppliers (supplierId, name, contact)
+            VALUES (?, ?, '')
+            ON CONFLICT (name) DO NOTHING
+            ''', zip(self._reserve_ids(cursor, 'suppliers', len(missing)), missing))
+            ids.update(tuple(row) for row in self._select_in(cursor, query, missing))
+        return ids
 
+    @_writes
+    def add_suppliers(self, suppliers: List[Dict[str, Any]]) -> int:
+        cursor = self.conn.cursor()
+        try:
+            self._begin()
+            cursor.executemany('''
+            INSERT INTO suppliers (supplierId, name, contact)
+            VALUES (?, ?, ?)
+            ''', [(supplier['supplierId'], supplier['name'], supplier['contact']) for supplier in suppliers])
+            self._commit()
+            return cursor.rowcount
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    @_writes
     def add_order(self, order: Dict[str, Any], items: List[Dict[str, Any]]):
       cursor = self.conn.cursor()
       cursor.execute('''
@@ -381,8 +1484,169 @@ class Database:
           VALUES (?, ?, ?, ?)
           ''', (order['orderId'], item['productId'], item['quantity'], item['price']))
       
-      self.conn.commit()
+      self._commit()
+
+    @_writes
+    # reserve_stock=False loads orders as history: products must exist, but their stock is
+    # neither checked nor decremented. Results are keyed by orderId, so an id listed more than
+    # once in the batch is rejected as a whole.
+    def add_orders(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+                   reserve_stock: bool = True) -> Dict[str, Any]:
+        cursor = self.conn.cursor()
+        accepted = []
+        rejected = {}
+        repeated = {order_id for order_id, count in Counter(
+            order['orderId'] for order, _ in batch).items() if count > 1}
+
+        try:
+            self._begin()
+
+            order_ids = [order['orderId'] for order, _ in batch]
+            product_ids = {item['productId'] for _, items in batch for item in items}
+            existing_orders = {row[0] for row in self._select_in(
+                cursor, 'SELECT orderId FROM orders WHERE orderId IN ({})', order_ids)}
+            stock = dict(self._select_in(
+                cursor, 'SELECT productId, stockQuantity FROM products WHERE productId IN ({})', product_ids))
+
+            order_rows = []
+            item_rows = []
+            decrements = {}
+
+            for order, items in batch:
+                order_id = order['orderId']
+                if order_id in repeated:
+                    rejected[order_id] = f"Order {order_id} is listed more than once"
+                    continue
+                if order_id in existing_orders:
+                    rejected[order_id] = f"Order {order_id} already exists"
+                    continue
+                if not items:
+                    rejected[order_id] = f"No items found for order {order_id}"
+                    continue
+
+                wanted = {}
+                for item in items:
+                    if item['quantity'] <= 0:
+                        rejected[order_id] = f"Quantity must be positive for product {item['productId']}"
+                        break
+                    wanted[item['productId']] = wanted.get(item['productId'], 0) + item['quantity']
+                if order_id in rejected:
+                    continue
+
+                for product_id, quantity in wanted.items():
+                    if product_id not in stock:
+                        rejected[order_id] = f"Product with ID {product_id} does not exist"
+                        break
+                    if reserve_stock and stock[product_id] < quantity:
+                        rejected[order_id] = f"Not enough stock for product {product_id}. Available: {stock[product_id]}"
+                        break
+                if order_id in rejected:
+                    continue
+
+                if reserve_stock:
+                    for product_id, quantity in wanted.items():
+                        stock[product_id] -= quantity
+                        decrements[product_id] = decrements.get(product_id, 0) + quantity
+
+                existing_orders.add(order_id)
+                accepted.append(order_id)
+                order_rows.append((order_id, order['orderDate'], order['status'], order['totalAmount']))
+                item_rows.extend((order_id, item['productId'], item['quantity'], item['price']) for item in items)
+
+            cursor.executemany('''
+            INSERT INTO orders (orderId, orderDate, status, totalAmount)
+            VALUES (?, ?, ?, ?)
+            ''', order_rows)
+
+            cursor.executemany('''
+            INSERT INTO order_items (orderId, productId, quantity, price)
+            VALUES (?, ?, ?, ?)
+            ''', item_rows)
+
+            cursor.executemany('''
+            UPDATE products
+            SET stockQuantity = stockQuantity - ?
+            WHERE productId = ?
+            ''', [(quantity, product_id) for product_id, quantity in decrements.items()])
+
+            self._commit()
+            return {'accepted': accepted, 'rejected': rejected, 'stock_changes': decrements}
+
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    @_writes
+    def place_order(self, order: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not items:
+            raise ValueError(f"No items found for order {order['orderId']}")
+
+        cursor = self.conn.cursor()
+        wanted = {}
+        for item in items:
+            if item['quantity'] <= 0:
+                raise ValueError(f"Quantity must be positive for product {item['productId']}")
+            wanted[item['productId']] = wanted.get(item['productId'], 0) + item['quantity']
+
+        try:
+            self._begin()
+
+            short = []
+            for product_id, quantity in wanted.items():
+                cursor.execute('''
+                UPDATE products
+                SET stockQuantity = stockQuantity - ?
+                WHERE productId = ? AND stockQuantity >= ?
+                ''', (quantity, product_id, quantity))
+                if cursor.rowcount == 0:
+                    short.append(product_id)
+
+            if short:
+                available = dict(self._select_in(
+                    cursor, 'SELECT productId, stockQuantity FROM products WHERE productId IN ({})', short))
+                self._rollback()
+                return {
+                    'placed': False,
+                    'shortages': {pid: {'requested': wanted[pid], 'available': available.get(pid, 0)}
+                                  for pid in short},
+                }
+
+            cursor.execute('''
+            INSERT INTO orders (orderId, orderDate, status, totalAmount)
+            VALUES (?, ?, ?, ?)
+            ''', (order['orderId'], order['orderDate'], order['status'], order['totalAmount']))
+
+            cursor.executemany('''
+            INSERT INTO order_items (orderId, productId, quantity, price)
+            VALUES (?, ?, ?, ?)
+            ''', [(order['orderId'], item['productId'], item['quantity'], item['price']) for item in items])
+
+            self._commit()
+            return {'placed': True, 'shortages': {}}
 
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    def _select_in(self, cursor, query: str, values, chunk_size: int = 500) -> List[Tuple]:
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            cursor.execute(query.format(', '.join('?' * len(chunk))), chunk)
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def _update_from_values(self, cursor, query: str, rows: List[Tuple], chunk_size: int = 500) -> List[Tuple]:
+        returned = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            placeholders = ', '.join('(' + ', '.join('?' * len(chunk[0])) + ')' for _ in chunk)
+            cursor.execute(query.format(placeholders), [value for row in chunk for value in row])
+            returned.extend(cursor.fetchall())
+        return returned
+
+    @_writes
     def add_shipment(self, shipment: Dict[str, Any]):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -390,33 +1654,296 @@ class Database:
         VALUES (?, ?, ?, ?)
         ''', (shipment['shipmentId'], shipment['orderId'], 
               shipment['shipmentDate'], shipment['status']))
-        self.conn.commit()
+        self._commit()
 
+    @_writes
     def add_supply_record(self, record: Dict[str, Any]):
         cursor = self.conn.cursor()
-        cursor.execute('''
-        INSERT INTO supply_records (productId, productName, quantity, supplierName, supplyDate)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (record['product_id'], record['product_name'], 
-              record['quantity'], record['supplier_name'], record['supply_date']))
-        self.conn.commit()
+        try:
+            self._begin()
+            supplier_ids = self._supplier_ids(cursor, [record['supplier_name']])
+            cursor.execute('''
+            INSERT INTO supply_records (productId, quantity, supplierId, supplyDate)
+            VALUES (?, ?, ?, ?)
+            ''', (record['product_id'], record['quantity'],
+                  supplier_ids.get(record['supplier_name']), record['supply_date']))
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            raise e
 
+    @_writes
+    def add_supply_records(self, records: List[Dict[str, Any]]) -> int:
+        cursor = self.conn.cursor()
+        try:
+            self._begin()
+            supplier_ids = self._supplier_ids(cursor, [record['supplier_name'] for record in records])
+            cursor.executemany('''
+            INSERT INTO supply_records (productId, quantity, supplierId, supplyDate)
+            VALUES (?, ?, ?, ?)
+            ''', [(record['product_id'], record['quantity'], supplier_ids.get(record['supplier_name']),
+                   record['supply_date']) for record in records])
+            self._commit()
+            return cursor.rowcount
+        except Exception as e:
+            self._rollback()
+            raise e
+
+    @_reports
     def get_supply_records(self) -> List[Dict[str, Any]]:
       cursor = self.conn.cursor()
-      cursor.execute('''
-      SELECT 
-          recordId as "recordId",
-          productId as "productId",
-          productName as "productName",
-          quantity as "quantity",
-          supplierName as "supplierName",
-          supplyDate as "supplyDate"
-      FROM supply_records 
-      ORDER BY supplyDate DESC
-      ''')
+      cursor.execute(SUPPLY_RECORD_SELECT + 'ORDER BY r.supplyDate DESC')
       
-      columns = [column[0] for column in cursor.description]
-      return [dict(zip(columns, row)) for row in cursor.fetchall()]
+      return self._fetch_rows(cursor)
+
+    def iter_products(self, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        return self._iter_pages(PRODUCT_SELECT, [], [],
+                                [('p.productId', 'productId')], False, page_size)
+
+    def iter_suppliers(self, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        return self._iter_pages('SELECT * FROM suppliers', [], [],
+                                [('supplierId', 'supplierId')], False, page_size)
+
+    def iter_orders(self, page_size: int = 500, status: Optional[str] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('orderDate', 'status', status, start_date, end_date)
+        return self._iter_pages('SELECT * FROM orders', conditions, params,
+                                [('orderDate', 'orderDate'), ('orderId', 'orderId')], True, page_size)
+
+    def iter_shipments(self, page_size: int = 500, status: Optional[str] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('s.shipmentDate', 's.status', status, start_date, end_date)
+        return self._iter_pages('''
+        SELECT
+            s.shipmentId,
+            s.orderId,
+            o.orderDate,
+            o.status as orderStatus,
+            s.shipmentDate,
+            s.status as shipmentStatus,
+            o.totalAmount
+        FROM shipments s
+        JOIN orders o ON s.orderId = o.orderId
+        ''', conditions, params,
+            [('s.shipmentDate', 'shipmentDate'), ('s.shipmentId', 'shipmentId')], True, page_size)
+
+    def iter_supply_records(self, page_size: int = 500, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('r.supplyDate', None, None, start_date, end_date)
+        return self._iter_pages(SUPPLY_RECORD_SELECT, conditions, params,
+                                [('r.supplyDate', 'supplyDate'), ('r.recordId', 'recordId')], True, page_size)
+
+    def _date_status_filters(self, date_column: str, status_column: Optional[str], status: Optional[str],
+                             start_date: Optional[str], end_date: Optional[str]) -> Tuple[List[str], List[Any]]:
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append(f'{status_column} = ?')
+            params.append(status)
+        if start_date is not None:
+            conditions.append(f'{date_column} >= ?')
+            params.append(str(start_date))
+        if end_date is not None:
+            conditions.append(f'{date_column} <= ?')
+            params.append(str(end_date))
+        return conditions, params
+
+    def _iter_pages(self, query: str, conditions: List[str], params: List[Any],
+                    keys: List[Tuple[str, str]], descending: bool, page_size: int) -> Iterator[Dict[str, Any]]:
+        if page_size <= 0:
+            raise ValueError("Page size must be positive")
+
+        key_columns = ', '.join(column for column, _ in keys)
+        direction = ' DESC' if descending else ''
+        order_by = ', '.join(column + direction for column, _ in keys)
+        last_key = None
+
+        reader = None
+        if self._snapshot is not None and getattr(self._local, 'conn', None) is None:
+            reader = self._snapshot_reader(pin=True)
+        try:
+            while True:
+                where = list(conditions)
+                page_params = list(params)
+                if last_key is not None:
+                    where.append(f"({key_columns}) {'<' if descending else '>'} ({', '.join('?' * len(keys))})")
+                    page_params.extend(last_key)
+
+                sql = query
+                if where:
+                    sql += ' WHERE ' + ' AND '.join(where)
+                sql += f' ORDER BY {order_by} LIMIT ?'
+                page_params.append(page_size)
+
+                if reader is None:
+                    rows = self._fetch_page(sql, page_params)
+                else:
+                    with self._reading_from(reader.conn):
+                        rows = self._fetch_page(sql, page_params)
+                yield from rows
+
+                if len(rows) < page_size:
+                    return
+                last_key = [rows[-1][field] for _, field in keys]
+        finally:
+            if reader is not None:
+                self._unpin_snapshot(reader)
+
+    @_reports
+    def _fetch_page(self, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return self._fetch_rows(cursor)
+
+    def _fetch_rows(self, cursor) -> List[Dict[str, Any]]:
+        rows = cursor.fetchall()
+        if self.compact_rows:
+            return rows
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _fetch_row(self, cursor) -> Optional[Dict[str, Any]]:
+        row = cursor.fetchone()
+        if row is None or self.compact_rows:
+            return row
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    @_reports
+    def get_daily_revenue(self, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('day', None, None, start_date, end_date)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT day, orderCount, revenue
+        FROM daily_revenue
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY day
+        ''', params)
+        return self._fetch_rows(cursor)
+
+    @_reports
+    def get_revenue_summary(self, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Dict[str, Any]:
+        conditions, params = self._date_status_filters('day', None, None, start_date, end_date)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT COALESCE(SUM(orderCount), 0) as orderCount, COALESCE(SUM(revenue), 0) as revenue
+        FROM daily_revenue
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ''', params)
+        return self._fetch_row(cursor)
+
+    @_reports
+    def get_top_products(self, limit: int = 10, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('s.day', None, None, start_date, end_date)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT
+            s.productId,
+            p.name as productName,
+            SUM(s.unitsSold) as unitsSold,
+            SUM(s.revenue) as revenue
+        FROM daily_product_sales s
+        LEFT JOIN products p ON s.productId = p.productId
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        GROUP BY s.productId
+        HAVING SUM(s.unitsSold) > 0
+        ORDER BY unitsSold DESC, revenue DESC
+        LIMIT ?
+        ''', params + [limit])
+        return self._fetch_rows(cursor)
+
+    @_reports
+    def get_product_daily_sales(self, product_id: int, start_date: Optional[str] = None,
+                                end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('day', None, None, start_date, end_date)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT day, unitsSold, revenue
+        FROM daily_product_sales
+        WHERE {' AND '.join(['productId = ?'] + conditions)}
+        ORDER BY day
+        ''', [product_id] + params)
+        return self._fetch_rows(cursor)
+
+    @_reports
+    def get_supplier_supply(self, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        conditions, params = self._date_status_filters('d.day', None, None, start_date, end_date)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT s.name as supplierName, SUM(d.recordCount) as recordCount, SUM(d.quantity) as quantity
+        FROM daily_supplier_supply d
+        JOIN suppliers s ON s.supplierId = d.supplierId
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        GROUP BY d.supplierId
+        HAVING SUM(d.recordCount) > 0
+        ORDER BY quantity DESC
+        ''', params)
+        return self._fetch_rows(cursor)
+
+    @_writes
+    def rebuild_aggregates(self) -> Dict[str, int]:
+        tables = {
+            'daily_revenue': ('day', ('orderCount', 'revenue')),
+            'daily_product_sales': ('day, productId', ('unitsSold', 'revenue')),
+            'daily_supplier_supply': ('supplierId, day', ('recordCount', 'quantity')),
+        }
+
+        def load(table, key, values):
+            rows = self.conn.execute(f'SELECT {key}, {", ".join(values)} FROM {table}').fetchall()
+            key_size = len(key.split(','))
+            return {tuple(row[:key_size]): tuple(row[key_size:]) for row in rows}
+
+        try:
+            self._begin()
+            before = {table: load(table, key, values) for table, (key, values) in tables.items()}
+            for statement in AGGREGATE_REBUILD:
+                self.conn.execute(statement)
+            after = {table: load(table, key, values) for table, (key, values) in tables.items()}
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            raise e
+
+        mismatches = {}
+        for table, (_, values) in tables.items():
+            zero = (0,) * len(values)
+            keys = set(before[table]) | set(after[table])
+            mismatches[table] = sum(
+                1 for key in keys
+                if any(abs(old - new) > 1e-6
+                       for old, new in zip(before[table].get(key, zero), after[table].get(key, zero))))
+        return mismatches
 
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        self.disable_snapshots()
+        if self._flusher is not None:
+            self._stop_flushing.set()
+            self._flusher.join()
+            self._flusher = None
+            self.flush()
+        for reader in self._all_readers:
+            reader.close()
+        self._writer.close()
+
+class IdAllocator:
+    def __init__(self, db: Database, name: str, block_size: int = 100):
+        if block_size <= 0:
+            raise ValueError("Block size must be positive")
+        self.db = db
+        self.name = name
+        self.block_size = block_size
+        self._block = range(0)
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._position >= len(self._block):
+                self._block = self.db.reserve_ids(self.name, self.block_size)
+                self._position = 0
+            self._position += 1
+            return self._block[self._position - 1]
@@ -0,0 +1,225 @@
+import functools
+import json
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from database import Database
+
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')]
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def record(self, elapsed_ms: float, rows: int = 0):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        for position, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[position] += 1
+                break
+
+    def percentile(self, fraction: float) -> float:
+        target = self.count * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'rows': self.rows,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms,
+            'buckets': {('inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in zip(BUCKETS_MS, self.buckets) if count},
+        }
+
+def _row_count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+class Instrumentation:
+    def __init__(self, slow_query_ms: float = 50.0, slow_log_size: int = 1000):
+        self.slow_query_ms = slow_query_ms
+        self.methods: Dict[str, LatencyHistogram] = {}
+        self.statements: Dict[str, LatencyHistogram] = {}
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self.db: Optional[Database] = None
+        self._plans: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def attach(self, db: Database) -> 'Instrumentation':
+        if self.db is not None:
+            raise ValueError("Instrumentation is already attached to a database")
+        self.db = db
+        for name in dir(Database):
+            if name.startswith('_') or name in ('close', 'connection', 'conn', 'open_connections'):
+                continue
+            if callable(getattr(Database, name)):
+                setattr(db, name, self._wrap(name, getattr(db, name)))
+        db._fetch_page = self._wrap_fetch(db._fetch_page)
+        for conn in db.open_connections():
+            conn.set_trace_callback(self._trace)
+        return self
+
+    def detach(self):
+        if self.db is None:
+            return
+        for name in list(vars(self.db)):
+            if getattr(vars(self.db)[name], '_instrumented', False):
+                delattr(self.db, name)
+        for conn in self.db.open_connections():
+            conn.set_trace_callback(None)
+        self.db = None
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            outer = getattr(self._local, 'method', None)
+            self._local.method = outer or name
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self._finish_statement()
+                self._local.method = outer
+            if hasattr(result, '__next__'):
+                return self._wrap_iterator(name, result, start)
+            self._record(self.methods, name, (time.perf_counter() - start) * 1000, _row_count(result))
+            if outer is None:
+                self._explain_slow_queries()
+            return result
+        wrapper._instrumented = True
+        return wrapper
+
+    # Paged iterators run their queries lazily, after the wrapped method has returned, so the
+    # method context is set again around every step, and each page's statement is closed
+    # as soon as it is fetched instead of when the consumer gets round to the next one.
+    def _wrap_fetch(self, fetch):
+        @functools.wraps(fetch)
+        def wrapper(*args, **kwargs):
+            try:
+                return fetch(*args, **kwargs)
+            finally:
+                self._finish_statement()
+        wrapper._instrumented = True
+        return wrapper
+
+    def _wrap_iterator(self, name: str, iterator, start: float):
+        rows = 0
+        try:
+            while True:
+                outer = getattr(self._local, 'method', None)
+                self._local.method = outer or name
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    self._local.method = outer
+                rows += 1
+                yield row
+        finally:
+            self._finish_statement()
+            self._record(self.methods, name, (time.perf_counter() - start) * 1000, rows)
+            self._explain_slow_queries()
+
+    def _trace(self, sql: str):
+        if getattr(self._local, 'explaining', False):
+            return
+        self._finish_statement()
+        self._local.statement = (sql, time.perf_counter(), getattr(self._local, 'method', None))
+
+    def _finish_statement(self):
+        current = getattr(self._local, 'statement', None)
+        if current is None:
+            return
+        self._local.statement = None
+        sql, start, method = current
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record(self.statements, normalize_sql(sql), elapsed_ms)
+        if elapsed_ms >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries.append({
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'method': method,
+                    'sql': sql.strip(),
+                    'duration_ms': elapsed_ms,
+                    'plan': None,
+                })
+
+    def _explain_slow_queries(self):
+        with self._lock:
+            pending = [entry for entry in self.slow_queries if entry['plan'] is None]
+        if not pending or self.db is None:
+            return
+
+        self._local.explaining = True
+        try:
+            for entry in pending:
+                key = normalize_sql(entry['sql'])
+                if key not in self._plans:
+                    try:
+                        self._plans[key] = Database.explain_query_plan(self.db, entry['sql'])
+                    except Exception as e:
+                        self._plans[key] = [f"EXPLAIN failed: {e}"]
+                entry['plan'] = self._plans[key]
+        finally:
+            self._local.explaining = False
+
+    def _record(self, table: Dict[str, LatencyHistogram], key: str, elapsed_ms: float, rows: int = 0):
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = LatencyHistogram()
+            histogram.record(elapsed_ms, rows)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'slow_query_ms': self.slow_query_ms,
+                'methods': {name: histogram.to_dict() for name, histogram in self.methods.items()},
+                'statements': {sql: histogram.to_dict() for sql, histogram in self.statements.items()},
+                'slow_queries': [dict(entry) for entry in self.slow_queries],
+            }
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self.methods.clear()
+            self.statements.clear()
+            self.slow_queries.clear()
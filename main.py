@@ -1,3 +1,10 @@
+import argparse
+import json
+import os
+import shlex
+import sqlite3
+import sys
+import time
 from datetime import date
 from Model.wareHouse_class import Warehouse
 from Model.employee_class import Employee
@@ -6,27 +13,40 @@ from Model.order_class import Order
 from Model.supplier_class import Supplier
 from Model.shipment_class import Shipment
 from Model.orderItem_class import OrderItem
-from database import Database
+from database import Database, IdAllocator
+from cache import CachedDatabase
+from catalog import LazyCatalog
+from instrumentation import Instrumentation
+
+# Products held by the warehouse change stock through it, so its capacity check runs and
+# the inventory's stock levels stay in step; catalog-only products just change in memory.
+def _add_stock(warehouse, product, quantity: int):
+    if warehouse.inventory.getProduct(product.productId) is product:
+        warehouse.updateStock(product.productId, quantity)
+    else:
+        product.updateStock(quantity)
+
+# Stock the database has already changed (restocks, shortages) is mirrored without the
+# capacity check, then re-indexed.
+def _sync_stock(warehouse, product, quantity: int):
+    product.stockQuantity = quantity
+    warehouse.inventory.refreshProduct(product.productId)
 
 def main():
-    db = Database()
+    database = Database()
+    instrumentation = None
+    if os.environ.get("WAREHOUSE_SLOW_QUERY_MS"):
+        instrumentation = Instrumentation(float(os.environ["WAREHOUSE_SLOW_QUERY_MS"])).attach(database)
+    db = CachedDatabase(database)
     warehouse = Warehouse(1, "New York", 500)
     employee = Employee(1, "Alice", "Manager")
 
-    products = {}
-    all_products = db.get_all_products()
-    for p in all_products:
-      product_id = p['productId']
-      
-      product_object = Product(**p)
-      product[product_id] = product_object
-    # products = {p['productId']: Product(**p) for p in db.get_all_products()}
+    products = LazyCatalog(db)
     orders = {}
     shipments = {}
     
-    order_counter = db.get_max_order_id() + 1
-    shipment_counter = db.get_max_shipment_id() + 1 if db.get_max_shipment_id() else 1
-    supplier_counter = db.get_max_supplier_id() + 1 if db.get_max_supplier_id() else 1
+    order_ids = IdAllocator(db, 'orders')
+    shipment_ids = IdAllocator(db, 'shipments')
 
     while True:
         print("\n=== Warehouse Management System ===")
@@ -34,7 +54,8 @@ def main():
         print("2. Supplier Management")
         print("3. Order Management")
         print("4. Shipment Management")
-        print("5. Exit")
+        print("5. Query Statistics")
+        print("6. Exit")
         choice = input("Select an option: ")
 
         if choice == "1":
@@ -44,6 +65,7 @@ def main():
             print("3. Remove Product")
             print("4. Check Product Stock")
             print("5. Add Stock to Product")
+            print("6. Search Products")
             choice_1 = input("Select an option: ")
 
             if choice_1 == "1":
@@ -59,8 +81,12 @@ def main():
                     qty = int(input("Quantity: "))
                     
                     product = Product(pid, name, desc, price, qty)
+                    try:
+                        employee.manageInventory(warehouse, product, "add")
+                    except ValueError as ve:
+                        print(f"❌ Error: {ve}")
+                        continue
                     products[pid] = product
-                    employee.manageInventory(warehouse, product, "add")
                     db.add_product(product.to_dict())
                     print("✅ Product added successfully.")
                 except ValueError:
@@ -68,18 +94,19 @@ def main():
 
             elif choice_1 == "2":
                 print("\n--- All Products ---")
-                if not products:
+                found = False
+                for p in db.iter_products():
+                    found = True
+                    print(f"ID: {p['productId']}, Name: {p['name']}, Price: {p['price']}, Stock: {p['stockQuantity']}")
+                if not found:
                     print("No products registered.")
-                else:
-                    for p in products.values():
-                        print(f"ID: {p.productId}, Name: {p.name}, Price: {p.price}, Stock: {p.stockQuantity}")
 
             elif choice_1 == "3":
               try:
                   pid = int(input("Enter Product ID to remove: "))
                   
                   if pid not in products:
-                      print("❌ Product not found in current session!")
+                      print("❌ Product not found!")
                       continue
                       
                   db.remove_product(pid)
@@ -96,8 +123,9 @@ def main():
 
             elif choice_1 == "4":
                 pid = int(input("Enter Product ID to check stock: "))
-                if pid in products:
-                    print(f"Available quantity: {products[pid].stockQuantity}")
+                product_data = db.get_product(pid)
+                if product_data:
+                    print(f"Available quantity: {product_data['stockQuantity']}")
                 else:
                     print("❌ Product not found.")
 
@@ -105,12 +133,24 @@ def main():
                 pid = int(input("Product ID: "))
                 if pid in products:
                     qty = int(input("Quantity to add: "))
-                    products[pid].updateStock(qty)
+                    try:
+                        _add_stock(warehouse, products[pid], qty)
+                    except ValueError as ve:
+                        print(f"❌ Error: {ve}")
+                        continue
                     db.update_product_stock(pid, qty)
                     print("✅ Stock updated.")
                 else:
                     print("❌ Product not found.")
 
+            elif choice_1 == "6":
+                text = input("Search for: ").strip()
+                results = db.search_products(text)
+                if not results:
+                    print("No matching products.")
+                for p in results:
+                    print(f"ID: {p['productId']}, Name: {p['name']}, Price: {p['price']}, Stock: {p['stockQuantity']}, Supplier: {p['supplierName']}")
+
         elif choice == "2":
             print("\n--- Supplier Management ---")
             print("1. Add Supplier and Supply Products")
@@ -121,23 +161,24 @@ def main():
                 name = input("Supplier Name: ")
                 contact = input("Contact Info: ")
                 
-                supplier = Supplier(supplier_counter, name, contact)
-                db.add_supplier({
-                    'supplierId': supplier_counter,
-                    'name': name,
-                    'contact': contact
-                })
-                print(f"✅ Supplier registered with ID {supplier_counter}")
-                supplier_counter += 1
+                supplier_id = db.upsert_supplier(name, contact)
+                supplier = Supplier(supplier_id, name, contact)
+                print(f"✅ Supplier registered with ID {supplier_id}")
 
                 pid = int(input("Product ID to supply: "))
                 if pid in products:
                     qty = int(input("Quantity supplied: "))
-                    supplier.supplyProduct(products[pid], qty)
+                    product = products[pid]
+                    try:
+                        _add_stock(warehouse, product, qty)
+                    except ValueError as ve:
+                        print(f"❌ Error: {ve}")
+                        continue
+                    product.supplierName = supplier.name
+                    warehouse.inventory.refreshProduct(pid)
                     db.update_product_stock(pid, qty)
                     db.add_supply_record({
                         'product_id': pid,
-                        'product_name': products[pid].name,
                         'quantity': qty,
                         'supplier_name': supplier.name,
                         'supply_date': str(date.today())
@@ -148,12 +189,12 @@ def main():
 
             elif choice_2 == "2":
                 print("\n--- Supply Records ---")
-                records = db.get_supply_records()
-                if not records:
+                found = False
+                for record in db.iter_supply_records():
+                    found = True
+                    print(f"Date: {record['supplyDate']}, Product: {record['productName']}, Quantity: {record['quantity']}, Supplier: {record['supplierName']}")
+                if not found:
                     print("No supply records found.")
-                else:
-                    for record in records:
-                        print(f"Date: {record['supplyDate']}, Product: {record['productName']}, Quantity: {record['quantity']}, Supplier: {record['supplierName']}")
 
         elif choice == "3":
             print("\n--- Order Management ---")
@@ -161,10 +202,12 @@ def main():
             print("2. Cancel Order")
             print("3. Track Order Status")
             print("4. View All Orders")
+            print("5. Expire Stale Pending Orders")
             choice_3 = input("Select an option: ")
 
             if choice_3 == "1":
               order_items = []
+              requested = {}
               while True:
                   try:
                       pid = int(input("Enter Product ID: "))
@@ -177,13 +220,13 @@ def main():
                           print("❌ Quantity must be positive!")
                           continue
                           
-                      if qty > products[pid].stockQuantity:
-                          print(f"❌ Not enough stock! Available: {products[pid].stockQuantity}")
+                      available = products[pid].stockQuantity - requested.get(pid, 0)
+                      if qty > available:
+                          print(f"❌ Not enough stock! Available: {available}")
                           continue
                           
                       order_items.append(OrderItem(products[pid], qty))
-                      products[pid].stockQuantity -= qty
-                      db.update_product_stock(pid, -qty)
+                      requested[pid] = requested.get(pid, 0) + qty
                       
                       cont = input("Add another product? (yes/no): ").lower()
                       if cont not in ['yes', 'y']:
@@ -197,12 +240,20 @@ def main():
                   print("⚠️ No products added to order!")
                   continue
                   
-              order = Order(order_counter, date.today(), "Pending", order_items)
+              order_id = order_ids.next_id()
+              order = Order(order_id, date.today(), "Pending", order_items)
               employee.processOrder(order)
-              db.add_order(order.to_dict(), order.items_to_dict())
-              orders[order_counter] = order
-              print(f"✅ Order #{order_counter} created. Total: ${order.totalAmount:.2f}")
-              order_counter += 1
+              result = db.place_order(order.to_dict(), order.items_to_dict())
+              if not result['placed']:
+                  for pid, shortage in result['shortages'].items():
+                      _sync_stock(warehouse, products[pid], shortage['available'])
+                      print(f"❌ Not enough stock for product {pid}! Requested: {shortage['requested']}, Available: {shortage['available']}")
+                  continue
+
+              for pid, qty in requested.items():
+                  _add_stock(warehouse, products[pid], -qty)
+              orders[order_id] = order
+              print(f"✅ Order #{order_id} created. Total: ${order.totalAmount:.2f}")
 
             elif choice_3 == "2":
               try:
@@ -213,9 +264,10 @@ def main():
                   if oid in orders:
                       orders[oid].status = "Cancelled"
                       
-                      for product_id, quantity in updated_products.items():
-                          if product_id in products:
-                              products[product_id].stockQuantity += quantity
+                  for product_id, quantity in updated_products.items():
+                      product = products.peek(product_id)
+                      if product:
+                          _sync_stock(warehouse, product, product.stockQuantity + quantity)
                   
                   print("✅ Order cancelled successfully. Stock quantities updated.")
                   
@@ -245,12 +297,35 @@ def main():
 
             elif choice_3 == "4":
                 print("\n--- All Orders ---")
-                all_orders = db.get_all_orders()
-                if not all_orders:
+                found = False
+                for order in db.iter_orders():
+                    found = True
+                    print(f"ID: {order['orderId']}, Status: {order['status']}, Date: {order['orderDate']}, Total: ${order['totalAmount']}")
+                if not found:
                     print("No orders found.")
-                else:
-                    for order in all_orders:
-                        print(f"ID: {order['orderId']}, Status: {order['status']}, Date: {order['orderDate']}, Total: ${order['totalAmount']}")
+
+            elif choice_3 == "5":
+              try:
+                  days = int(input("Expire Pending orders older than how many days? "))
+                  statuses = ('Pending',)
+                  if input("Also expire unshipped Placed orders? (yes/no): ").lower() in ['yes', 'y']:
+                      statuses = ('Pending', 'Placed')
+                  result = db.expire_pending_orders(days, statuses=statuses)
+                  
+                  for oid in result['expired']:
+                      if oid in orders:
+                          orders[oid].status = "Cancelled"
+                  for product_id, quantity in result['restocked'].items():
+                      product = products.peek(product_id)
+                      if product:
+                          _sync_stock(warehouse, product, product.stockQuantity + quantity)
+                  
+                  print(f"✅ Expired {len(result['expired'])} stale orders.")
+                  
+              except ValueError as ve:
+                  print(f"❌ Error: {ve}")
+              except Exception as e:
+                  print(f"❌ Failed to expire orders: {e}")
 
         elif choice == "4":
             print("\n--- Shipment Management ---")
@@ -276,8 +351,9 @@ def main():
                         print("⚠️ This order has already been shipped!")
                         continue
                         
+                    shipment_id = shipment_ids.next_id()
                     shipment_data = {
-                        'shipmentId': shipment_counter,
+                        'shipmentId': shipment_id,
                         'orderId': oid,
                         'shipmentDate': str(date.today()),
                         'status': "Shipped"
@@ -286,8 +362,7 @@ def main():
                     db.add_shipment(shipment_data)
                     db.update_order_status(oid, "Shipped")
                     
-                    print(f"✅ Shipment #{shipment_counter} created successfully.")
-                    shipment_counter += 1
+                    print(f"✅ Shipment #{shipment_id} created successfully.")
                     
                 except ValueError:
                     print("❌ Please enter a valid order ID!")
@@ -316,10 +391,11 @@ def main():
                       print("❌ Invalid status! Please choose from available options.")
                       continue
                       
-                  db.update_shipment_status(sid, new_status)
+                  result = db.update_shipment_statuses([(sid, new_status)])
                   
-                  if new_status == "Delivered":
-                      db.update_order_status(shipment['orderId'], "Delivered")
+                  if sid in result['rejected']:
+                      print(f"❌ {result['rejected'][sid]}")
+                      continue
                   
                   print(f"✅ Shipment {sid} status updated to '{new_status}'")
                   
@@ -331,24 +407,72 @@ def main():
             elif choice_4 == "3":
               print("\n--- All Shipments ---")
               try:
-                  shipments = db.get_all_shipments()
-                  if not shipments:
+                  found = False
+                  for ship in db.iter_shipments():
+                      if not found:
+                          found = True
+                          print(f"{'ID':<8} {'Order ID':<10} {'Shipment Date':<15} {'Status':<15} {'Order Total':<12}")
+                          print("-" * 60)
+                      print(
+                          f"{ship['shipmentId']:<8} "
+                          f"{ship['orderId']:<10} "
+                          f"{ship['shipmentDate']:<15} "
+                          f"{ship['shipmentStatus']:<15} "
+                          f"${ship['totalAmount']:<10.2f}"
+                      )
+                  if not found:
                       print("No shipments found.")
-                  else:
-                      print(f"{'ID':<8} {'Order ID':<10} {'Shipment Date':<15} {'Status':<15} {'Order Total':<12}")
-                      print("-" * 60)
-                      for ship in shipments:
-                          print(
-                              f"{ship['shipmentId']:<8} "
-                              f"{ship['orderId']:<10} "
-                              f"{ship['shipmentDate']:<15} "
-                              f"{ship['shipmentStatus']:<15} "
-                              f"${ship['totalAmount']:<10.2f}"
-                          )
               except Exception as e:
                   print(f"❌ Error retrieving shipments: {e}")
 
         elif choice == "5":
+            print("\n--- Query Statistics ---")
+            if instrumentation is None:
+                print("Instrumentation is off. Set WAREHOUSE_SLOW_QUERY_MS to enable it.")
+                continue
+
+            print("1. Show Method Latencies")
+            print("2. Show Slow Queries")
+            print("3. Export Statistics to JSON")
+            print("4. Reset Statistics")
+            choice_5 = input("Select an option: ")
+
+            if choice_5 == "1":
+                stats = instrumentation.snapshot()['methods']
+                if not stats:
+                    print("No calls recorded yet.")
+                else:
+                    print(f"{'Method':<32} {'Calls':>7} {'Rows':>9} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+                    print("-" * 80)
+                    for name, method in sorted(stats.items(), key=lambda entry: -entry[1]['total_ms']):
+                        print(
+                            f"{name:<32} {method['count']:>7} {method['rows']:>9} "
+                            f"{method['p50_ms']:>9.2f} {method['p95_ms']:>9.2f} {method['max_ms']:>9.2f}"
+                        )
+
+            elif choice_5 == "2":
+                slow_queries = instrumentation.snapshot()['slow_queries']
+                if not slow_queries:
+                    print("No slow queries recorded.")
+                for entry in slow_queries:
+                    print(f"\n[{entry['timestamp']}] {entry['method']} took {entry['duration_ms']:.2f} ms")
+                    print(entry['sql'])
+                    for detail in entry['plan'] or []:
+                        print(f"  -> {detail}")
+
+            elif choice_5 == "3":
+                path = input("Export file path: ").strip() or "query_stats.json"
+                try:
+                    instrumentation.export_json(path)
+                    print(f"✅ Statistics exported to {path}")
+                except OSError as e:
+                    print(f"❌ Failed to export statistics: {e}")
+
+            elif choice_5 == "4":
+                instrumentation.reset()
+                print("✅ Statistics reset.")
+
+        elif choice == "6":
             print("Shutting down system...")
             db.close()
             break
@@ -356,5 +480,207 @@ def main():
         else:
             print("❌ Invalid option, please try again.")
 
+def _parse_item(text: str):
+    product_id, _, quantity = text.partition(':')
+    return int(product_id), int(quantity or 1)
+
+def cmd_add_product(db, ids, args):
+    if db.get_product(args.id):
+        raise ValueError(f"Product ID {args.id} is already in use")
+    product = Product(args.id, args.name, args.description, args.price, args.stock)
+    db.add_product(product.to_dict())
+    return product.to_dict()
+
+def cmd_supply(db, ids, args):
+    product = db.get_product(args.product_id)
+    if not product:
+        raise ValueError(f"Product with ID {args.product_id} does not exist")
+    supplier_id = db.upsert_supplier(args.supplier, args.contact)
+    db.update_product_stock(args.product_id, args.quantity)
+    db.add_supply_record({
+        'product_id': args.product_id,
+        'quantity': args.quantity,
+        'supplier_name': args.supplier,
+        'supply_date': str(date.today())
+    })
+    return {'supplierId': supplier_id, 'productId': args.product_id, 'quantity': args.quantity}
+
+def cmd_create_order(db, ids, args):
+    order_items = []
+    for product_id, quantity in map(_parse_item, args.item):
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive for product {product_id}")
+        product = db.get_product(product_id)
+        if not product:
+            raise ValueError(f"Product with ID {product_id} does not exist")
+        order_items.append(OrderItem(Product(**product), quantity))
+
+    order = Order(ids['orders'].next_id(), date.today(), "Placed", order_items)
+    result = db.place_order(order.to_dict(), order.items_to_dict())
+    if not result['placed']:
+        raise ValueError("; ".join(
+            f"Not enough stock for product {pid}. Requested: {shortage['requested']}, Available: {shortage['available']}"
+            for pid, shortage in result['shortages'].items()))
+    return order.to_dict()
+
+def cmd_cancel_order(db, ids, args):
+    restocked = db.cancel_order(args.order_id, update_memory=True)
+    return {'orderId': args.order_id, 'restocked': restocked}
+
+def cmd_ship(db, ids, args):
+    order_data = db.get_order(args.order_id)
+    if not order_data:
+        raise ValueError(f"Order {args.order_id} not found")
+    if order_data['status'] == "Cancelled":
+        raise ValueError(f"Cannot ship cancelled order {args.order_id}")
+    if order_data['status'] == "Shipped":
+        raise ValueError(f"Order {args.order_id} has already been shipped")
+
+    shipment_data = {
+        'shipmentId': ids['shipments'].next_id(),
+        'orderId': args.order_id,
+        'shipmentDate': str(date.today()),
+        'status': "Shipped"
+    }
+    db.add_shipment(shipment_data)
+    db.update_order_status(args.order_id, "Shipped")
+    return shipment_data
+
+def cmd_update_shipment(db, ids, args):
+    result = db.update_shipment_statuses([(args.shipment_id, args.status)])
+    if args.shipment_id in result['rejected']:
+        raise ValueError(result['rejected'][args.shipment_id])
+    return {'shipmentId': args.shipment_id, 'status': args.status.capitalize(),
+            'ordersUpdated': result['orders_updated']}
+
+COMMANDS = {
+    'add-product': cmd_add_product,
+    'supply': cmd_supply,
+    'create-order': cmd_create_order,
+    'cancel-order': cmd_cancel_order,
+    'ship': cmd_ship,
+    'update-shipment': cmd_update_shipment,
+    'list-products': lambda db, ids, args: db.iter_products(),
+    'list-suppliers': lambda db, ids, args: db.iter_suppliers(),
+    'list-orders': lambda db, ids, args: db.iter_orders(
+        status=args.status, start_date=args.start_date, end_date=args.end_date),
+    'list-shipments': lambda db, ids, args: db.iter_shipments(
+        status=args.status, start_date=args.start_date, end_date=args.end_date),
+    'list-supply-records': lambda db, ids, args: db.iter_supply_records(
+        start_date=args.start_date, end_date=args.end_date),
+    'search-products': lambda db, ids, args: db.search_products(args.text, args.limit),
+}
+
+def _is_listing(command: str) -> bool:
+    return command.startswith('list-') or command == 'search-products'
+
+class BatchArgumentParser(argparse.ArgumentParser):
+    def error(self, message):
+        raise ValueError(message)
+
+def build_parser(batch: bool = False):
+    parser_class = BatchArgumentParser if batch else argparse.ArgumentParser
+    parser = parser_class(prog="main.py", description="Warehouse management. Run without arguments "
+                                     "for the interactive menu; list commands print one JSON object per line.")
+    if not batch:
+        parser.add_argument("--db", default="warehouse.db")
+        parser.add_argument("--group-commit-ms", type=float, help="Batch commits in windows of this many ms")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("add-product")
+    command.add_argument("--id", type=int, required=True)
+    command.add_argument("--name", required=True)
+    command.add_argument("--description", default="")
+    command.add_argument("--price", type=float, required=True)
+    command.add_argument("--stock", type=int, required=True)
+
+    command = commands.add_parser("supply")
+    command.add_argument("--supplier", required=True)
+    command.add_argument("--contact")
+    command.add_argument("--product-id", type=int, required=True)
+    command.add_argument("--quantity", type=int, required=True)
+
+    command = commands.add_parser("create-order")
+    command.add_argument("--item", action="append", required=True, metavar="PRODUCT_ID:QUANTITY")
+
+    command = commands.add_parser("cancel-order")
+    command.add_argument("--order-id", type=int, required=True)
+
+    command = commands.add_parser("ship")
+    command.add_argument("--order-id", type=int, required=True)
+
+    command = commands.add_parser("update-shipment")
+    command.add_argument("--shipment-id", type=int, required=True)
+    command.add_argument("--status", required=True, choices=["Pending", "Shipped", "Delivered", "Cancelled"],
+                         type=str.capitalize)
+
+    commands.add_parser("list-products")
+    commands.add_parser("list-suppliers")
+    for name in ("list-orders", "list-shipments", "list-supply-records"):
+        command = commands.add_parser(name)
+        if name != "list-supply-records":
+            command.add_argument("--status")
+        command.add_argument("--start-date")
+        command.add_argument("--end-date")
+
+    command = commands.add_parser("search-products")
+    command.add_argument("text")
+    command.add_argument("--limit", type=int, default=20)
+
+    if not batch:
+        command = commands.add_parser("batch", help="Replay a file of commands, one per line")
+        command.add_argument("path")
+        command.add_argument("--quiet", action="store_true", help="Only print the summary")
+    return parser
+
+def run_batch(db, ids, path: str, quiet: bool) -> int:
+    parser = build_parser(batch=True)
+    ops = failed = 0
+    start = time.perf_counter()
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            ops += 1
+            try:
+                args = parser.parse_args(shlex.split(line))
+                result = COMMANDS[args.command](db, ids, args)
+                if _is_listing(args.command):
+                    result = [dict(row) for row in result]
+                entry = {'line': line_number, 'ok': True, 'result': result}
+            except (ValueError, KeyError, sqlite3.Error) as e:
+                failed += 1
+                entry = {'line': line_number, 'ok': False, 'error': str(e)}
+            if not quiet:
+                print(json.dumps(entry))
+    db.flush()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'ops': ops, 'failed': failed, 'elapsed_sec': elapsed,
+                      'ops_per_sec': ops / elapsed if elapsed else 0.0}), file=sys.stderr)
+    return 1 if failed else 0
+
+def cli(argv) -> int:
+    args = build_parser().parse_args(argv)
+    db = Database(args.db, group_commit_ms=args.group_commit_ms)
+    block_size = 100 if args.command == "batch" else 1
+    ids = {name: IdAllocator(db, name, block_size) for name in ('orders', 'shipments')}
+    try:
+        if args.command == "batch":
+            return run_batch(db, ids, args.path, args.quiet)
+        try:
+            result = COMMANDS[args.command](db, ids, args)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        if _is_listing(args.command):
+            for row in result:
+                print(json.dumps(dict(row)))
+        else:
+            print(json.dumps(result))
+        return 0
+    finally:
+        db.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(cli(sys.argv[1:]) if len(sys.argv) > 1 else main())
\ No newline at end of file
@@ -0,0 +1,99 @@
+import inspect
+import re
+import sys
+from typing import List, Dict
+from database import Database
+
+READ_METHODS = [
+    ('get_product', (1,)),
+    ('product_exists', (1,)),
+    ('get_all_products', ()),
+    ('search_products', ('widget',)),
+    ('get_max_order_id', ()),
+    ('get_max_shipment_id', ()),
+    ('get_max_supplier_id', ()),
+    ('get_supplier_by_name', ('Supplier 1',)),
+    ('get_order', (1,)),
+    ('get_order_status', (1,)),
+    ('get_order_items', (1,)),
+    ('get_order_items_with_products', (1,)),
+    ('get_all_orders', ()),
+    ('get_shipment', (1,)),
+    ('get_shipment_status', (1,)),
+    ('get_shipment_details', (1,)),
+    ('get_all_shipments', ()),
+    ('get_supply_records', ()),
+    ('iter_products', ()),
+    ('iter_suppliers', ()),
+    ('iter_orders', ()),
+    ('iter_shipments', ()),
+    ('iter_supply_records', ()),
+    ('get_daily_revenue', ('2024-01-01', '2024-12-31')),
+    ('get_revenue_summary', ('2024-01-01', '2024-12-31')),
+    ('get_top_products', (10, '2024-01-01', '2024-12-31')),
+    ('get_product_daily_sales', (1, '2024-01-01', '2024-12-31')),
+    ('get_supplier_supply', ('2024-01-01', '2024-12-31')),
+]
+
+# Write paths are checked by explaining their statements, never by running them: this script
+# is pointed at live databases.
+WRITE_STATEMENTS = [
+    ('_cleanup_after_product_deletion', 'DELETE FROM order_items WHERE productId = ?', (1,)),
+    ('_cleanup_after_product_deletion', 'DELETE FROM supply_records WHERE productId = ?', (1,)),
+]
+
+FULL_SCAN_ALLOWED = {'get_all_products', 'iter_products', 'iter_suppliers'}
+
+RANKING_SORT_ALLOWED = {'get_top_products', 'get_supplier_supply'}
+
+# FTS5 reads its own shadow tables (products_fts_config, _data, _idx, _docsize) while
+# answering a MATCH; those lookups are traced too but are not the application's queries.
+FTS_SHADOW_TABLE = re.compile(r"_fts_(?:config|data|idx|docsize|content)\b", re.IGNORECASE)
+
+def is_app_statement(statement: str) -> bool:
+    statement = statement.lstrip()
+    if statement.startswith('--') or FTS_SHADOW_TABLE.search(statement):
+        return False
+    return statement.upper().startswith(('SELECT', 'UPDATE', 'DELETE'))
+
+def collect_statements(db: Database, method: str, args: tuple) -> List[str]:
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        result = getattr(db, method)(*args)
+        if inspect.isgenerator(result):
+            list(result)
+    finally:
+        db.conn.set_trace_callback(None)
+    return [statement for statement in statements if is_app_statement(statement)]
+
+def find_unindexed_plans(db: Database) -> Dict[str, List[str]]:
+    plans = [(method, statement, ()) for method, args in READ_METHODS
+             for statement in collect_statements(db, method, args)]
+    plans += WRITE_STATEMENTS
+
+    problems = {}
+    for method, statement, params in plans:
+        for detail in db.explain_query_plan(statement, params):
+            if 'USE TEMP B-TREE' in detail and method not in RANKING_SORT_ALLOWED:
+                problems.setdefault(method, []).append(detail)
+            elif detail.startswith('SCAN') and 'INDEX' not in detail and method not in FULL_SCAN_ALLOWED:
+                problems.setdefault(method, []).append(detail)
+    return problems
+
+def main():
+    db = Database(sys.argv[1] if len(sys.argv) > 1 else ":memory:")
+    problems = find_unindexed_plans(db)
+    db.close()
+
+    if not problems:
+        print("✅ All read methods use an index.")
+        return 0
+
+    for method, details in problems.items():
+        for detail in details:
+            print(f"❌ {method}: {detail}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from database import Database
+from analytics import (CHUNK_SIZE, EPOCH_DAY, fetch_chunks, max_product_id, require_numpy, supplier_names,
+                       to_columns, where_clause)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UNASSIGNED = "Unassigned"
+
+STATE_FIELDS = ['exists', 'stock', 'declared', 'latest', 'supplier', 'demand_rate', 'demand_std',
+                'lead_time', 'reorder_point', 'suggested']
+
+FILL = {'declared': -1, 'latest': -1, 'supplier': -1}
+
+PRODUCT_COLUMNS = 'productId, stockQuantity, COALESCE(supplierId, -1)'
+
+DTYPES = {'exists': 'bool', 'stock': 'int64', 'declared': 'int64', 'latest': 'int64', 'supplier': 'int64',
+          'demand_rate': 'float64', 'demand_std': 'float64', 'lead_time': 'float64',
+          'reorder_point': 'int64', 'suggested': 'int64'}
+
+# Every per-product figure lives in a dense array indexed by productId, so a full pass is a
+# handful of bincounts over daily_product_sales and supply_records, and an incremental
+# update just recomputes the same figures for the changed productIds and writes them back.
+#
+# Demand is the larger of the mean daily units sold over the last window_days and over
+# the last recent_days, so a product that has just picked up is not planned on its old
+# rate. supply_records only holds deliveries, not when they were ordered, so the lead
+# time is estimated as the mean gap between deliveries of a product within
+# lead_time_window days, falling back to default_lead_days.
+class ReplenishmentEngine:
+    def __init__(self, db: Database, as_of: Optional[str] = None, window_days: int = 28, recent_days: int = 7,
+                 review_days: int = 14, service_z: float = 1.65, default_lead_days: float = 7.0,
+                 max_lead_days: float = 90.0, lead_time_window: int = 180, chunk_size: int = CHUNK_SIZE):
+        require_numpy()
+        if window_days <= 0 or lead_time_window <= 0:
+            raise ValueError("Demand and lead time windows must be positive")
+        if not 0 < recent_days <= window_days:
+            raise ValueError("Recent window must be positive and no longer than the demand window")
+        if review_days < 0 or service_z < 0:
+            raise ValueError("Review period and service factor must not be negative")
+        if not 0 < default_lead_days <= max_lead_days:
+            raise ValueError("Default lead time must be positive and no longer than the maximum")
+
+        self.db = db
+        self.as_of = str(as_of or date.today())
+        self.window_days = window_days
+        self.recent_days = recent_days
+        self.review_days = review_days
+        self.service_z = service_z
+        self.default_lead_days = default_lead_days
+        self.max_lead_days = max_lead_days
+        self.lead_time_window = lead_time_window
+        self.chunk_size = chunk_size
+
+        self.supplier_names: Dict[int, str] = {}
+        self.item_mark = 0
+        self.record_mark = 0
+        self.exists = None
+
+        as_of_date = date.fromisoformat(self.as_of)
+        self._as_of_day = (as_of_date - date(1970, 1, 1)).days
+        self._until = str(as_of_date + timedelta(days=1))
+        self._demand_from = str(as_of_date - timedelta(days=window_days - 1))
+        self._supply_from = str(as_of_date - timedelta(days=lead_time_window - 1))
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            'as_of': self.as_of,
+            'window_days': self.window_days,
+            'recent_days': self.recent_days,
+            'review_days': self.review_days,
+            'service_z': self.service_z,
+            'default_lead_days': self.default_lead_days,
+            'max_lead_days': self.max_lead_days,
+            'lead_time_window': self.lead_time_window,
+        }
+
+    def run(self) -> int:
+        self.item_mark, self.record_mark = self._marks()
+        self.exists = None
+        self._allocate(max_product_id(self.db) + 1)
+        self._refresh(None)
+        self.supplier_names = supplier_names(self.db)
+        return int(self.exists.sum())
+
+    def update(self, product_ids: Optional[List[int]] = None) -> int:
+        if self.exists is None:
+            raise ValueError("Run a full replenishment pass before updating it")
+        item_mark, record_mark = self._marks()
+        if product_ids is None:
+            changed = self._changed_products()
+        else:
+            changed = np.unique(np.asarray(product_ids, dtype='int64'))
+        self.item_mark, self.record_mark = item_mark, record_mark
+        if len(changed):
+            self._allocate(int(changed.max()) + 1)
+            self._refresh(changed)
+        self.supplier_names = supplier_names(self.db)
+        return len(changed)
+
+    def _marks(self):
+        with self.db.connection() as conn:
+            return conn.execute('''
+            SELECT (SELECT COALESCE(MAX(itemId), 0) FROM order_items),
+                   (SELECT COALESCE(MAX(recordId), 0) FROM supply_records)
+            ''').fetchone()
+
+    # New order items and supply records are found through their autoincrement ids. Stock
+    # and supplier edits that come with neither (cancellations, manual stock updates) are
+    # caught by comparing the current products table against the last pass.
+    def _changed_products(self):
+        changed = []
+        for table, key, mark in (('order_items', 'itemId', self.item_mark),
+                                 ('supply_records', 'recordId', self.record_mark)):
+            for product_id, in self._select('DISTINCT productId', table, [f'{key} > ?'], [mark], ['int64']):
+                changed.append(product_id)
+
+        size = len(self.exists)
+        seen = np.zeros(size, dtype='bool')
+        for product_id, stock, supplier in self._select(PRODUCT_COLUMNS, 'products', [], [], ['int64'] * 3):
+            known = product_id < size
+            changed.append(product_id[~known])
+            product_id, stock, supplier = product_id[known], stock[known], supplier[known]
+            seen[product_id] = True
+            differs = ~self.exists[product_id] | (self.stock[product_id] != stock) | \
+                (self.declared[product_id] != supplier)
+            changed.append(product_id[differs])
+        changed.append(np.flatnonzero(self.exists & ~seen))
+        return np.unique(np.concatenate(changed)) if changed else np.zeros(0, dtype='int64')
+
+    def _select(self, columns: str, table: str, conditions: List[str], params: List[Any], dtypes: List[str],
+                product_ids=None) -> Iterator[List[Any]]:
+        if product_ids is None:
+            batches = [(conditions, params)]
+        else:
+            batches = [(conditions + [f"productId IN ({', '.join('?' * len(batch))})"], params + batch)
+                       for batch in (product_ids[start:start + 500].tolist()
+                                     for start in range(0, len(product_ids), 500))]
+        for batch_conditions, batch_params in batches:
+            query = f'SELECT {columns} FROM {table} {where_clause(batch_conditions)}'
+            for rows in fetch_chunks(self.db, query, batch_params, self.chunk_size):
+                yield to_columns(rows, dtypes)
+
+    def _allocate(self, size: int):
+        for field in STATE_FIELDS:
+            values = getattr(self, field, None) if self.exists is not None else None
+            if values is None:
+                values = np.zeros(0, dtype=DTYPES[field])
+            if size > len(values):
+                values = np.concatenate([values, np.full(size - len(values), FILL.get(field, 0), dtype=values.dtype)])
+            setattr(self, field, values)
+
+    def _refresh(self, product_ids):
+        size = len(self.exists)
+        index = slice(None) if product_ids is None else product_ids
+
+        def total(product_id, weights=None):
+            return np.bincount(product_id, weights=weights, minlength=size)[:size]
+
+        self.exists[index] = False
+        self.stock[index] = 0
+        self.declared[index] = -1
+        for product_id, stock, supplier in self._select(PRODUCT_COLUMNS, 'products', [], [], ['int64'] * 3,
+                                                        product_ids):
+            known = product_id < size
+            product_id, stock, supplier = product_id[known], stock[known], supplier[known]
+            self.exists[product_id] = True
+            self.stock[product_id] = stock
+            self.declared[product_id] = supplier
+
+        units = np.zeros(size)
+        squares = np.zeros(size)
+        recent = np.zeros(size)
+        for day, product_id, sold in self._select(f"{EPOCH_DAY.format('day')}, productId, unitsSold",
+                                                  'daily_product_sales', ['day >= ?', 'day < ?'],
+                                                  [self._demand_from, self._until],
+                                                  ['int64', 'int64', 'float64'], product_ids):
+            units += total(product_id, sold)
+            squares += total(product_id, sold * sold)
+            latest = self._as_of_day - day < self.recent_days
+            recent += total(product_id[latest], sold[latest])
+        mean = units / self.window_days
+        self.demand_rate[index] = np.maximum(mean, recent / self.recent_days)[index]
+        self.demand_std[index] = np.sqrt(np.maximum(squares / self.window_days - mean * mean, 0))[index]
+
+        supplies = list(self._select(f"{EPOCH_DAY.format('supplyDate')}, productId, supplierId", 'supply_records',
+                                     ['supplyDate >= ?', 'supplyDate < ?'], [self._supply_from, self._until],
+                                     ['int64'] * 3, product_ids))
+        gaps = np.zeros(size)
+        deliveries = np.zeros(size)
+        latest_supplier = np.full(size, -1, dtype='int64')
+        if supplies:
+            day = np.concatenate([chunk[0] for chunk in supplies])
+            product_id = np.concatenate([chunk[1] for chunk in supplies])
+            supplier = np.concatenate([chunk[2] for chunk in supplies])
+            order = np.lexsort((day, product_id))
+            day, product_id, supplier = day[order], product_id[order], supplier[order]
+            same = product_id[1:] == product_id[:-1]
+            gaps = total(product_id[1:][same], np.diff(day)[same].astype('float64'))
+            deliveries = total(product_id[1:][same])
+            last = np.append(~same, True) & (product_id < size)
+            latest_supplier[product_id[last]] = supplier[last]
+        lead_time = np.where(deliveries > 0, gaps / np.maximum(deliveries, 1), self.default_lead_days)
+        self.lead_time[index] = np.clip(lead_time, 1, self.max_lead_days)[index]
+        self.latest[index] = latest_supplier[index]
+        self.supplier[index] = np.where(self.declared >= 0, self.declared, self.latest)[index]
+
+        rate = self.demand_rate[index]
+        lead = self.lead_time[index]
+        stock = self.stock[index]
+        reorder_point = np.ceil(rate * lead + self.service_z * self.demand_std[index] * np.sqrt(lead)).astype('int64')
+        order_up_to = reorder_point + np.ceil(rate * self.review_days).astype('int64')
+        self.reorder_point[index] = reorder_point
+        self.suggested[index] = np.where(self.exists[index] & (stock <= reorder_point),
+                                         np.maximum(order_up_to - stock, 0), 0)
+
+    def supplier_name(self, product_id: int) -> str:
+        return self.supplier_names.get(int(self.supplier[product_id]), UNASSIGNED)
+
+    def reorder_points(self, product_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        if self.exists is None:
+            raise ValueError("Run a full replenishment pass first")
+        if product_ids is None:
+            product_ids = np.flatnonzero(self.exists)
+        return [{
+            'productId': int(product_id),
+            'stockQuantity': int(self.stock[product_id]),
+            'demandRate': float(self.demand_rate[product_id]),
+            'leadTimeDays': float(self.lead_time[product_id]),
+            'reorderPoint': int(self.reorder_point[product_id]),
+            'suggestedQuantity': int(self.suggested[product_id]),
+            'supplierName': self.supplier_name(product_id),
+        } for product_id in product_ids if product_id < len(self.exists) and self.exists[product_id]]
+
+    def purchase_list(self, supplier: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        if self.exists is None:
+            raise ValueError("Run a full replenishment pass first")
+        needed = np.flatnonzero(self.suggested > 0)
+        if supplier is not None:
+            ids = {name: supplier_id for supplier_id, name in self.supplier_names.items()}
+            needed = needed[self.supplier[needed] == ids.get(supplier, -1)]
+        needed = needed[np.argsort(-self.suggested[needed], kind='stable')]
+
+        names = {}
+        for product_id, name in self._select('productId, name', 'products', [], [], ['int64', 'object'],
+                                             np.sort(needed)):
+            names.update(zip(product_id.tolist(), name))
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for product_id in needed.tolist():
+            groups.setdefault(self.supplier_name(product_id), []).append({
+                'productId': product_id,
+                'name': names.get(product_id),
+                'stockQuantity': int(self.stock[product_id]),
+                'reorderPoint': int(self.reorder_point[product_id]),
+                'suggestedQuantity': int(self.suggested[product_id]),
+            })
+        return dict(sorted(groups.items()))
+
+    def save(self, path: str):
+        meta = dict(params=self.params(), item_mark=self.item_mark, record_mark=self.record_mark)
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **{field: getattr(self, field) for field in STATE_FIELDS})
+
+    @classmethod
+    def load(cls, db: Database, path: str, chunk_size: int = CHUNK_SIZE) -> 'ReplenishmentEngine':
+        require_numpy()
+        with np.load(path) as state:
+            meta = json.loads(str(state['meta']))
+            engine = cls(db, chunk_size=chunk_size, **meta['params'])
+            for field in STATE_FIELDS:
+                setattr(engine, field, state[field])
+        engine.item_mark = meta['item_mark']
+        engine.record_mark = meta['record_mark']
+        engine.supplier_names = supplier_names(db)
+        return engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute reorder points and a purchase list per supplier "
+                                                 "(requires numpy)")
+    parser.add_argument("--db", default="warehouse.db")
+    parser.add_argument("--state", default="replenishment.npz",
+                        help="Results of the last run; only changed products are recomputed when it matches")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved state and recompute every product")
+    parser.add_argument("--as-of", default=str(date.today()))
+    parser.add_argument("--window-days", type=int, default=28)
+    parser.add_argument("--recent-days", type=int, default=7)
+    parser.add_argument("--review-days", type=int, default=14)
+    parser.add_argument("--service-z", type=float, default=1.65)
+    parser.add_argument("--default-lead-days", type=float, default=7.0)
+    parser.add_argument("--lead-time-window", type=int, default=180)
+    parser.add_argument("--supplier", help="Only list products bought from this supplier")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        engine = ReplenishmentEngine(db, args.as_of, args.window_days, args.recent_days, args.review_days,
+                                     args.service_z, args.default_lead_days, lead_time_window=args.lead_time_window,
+                                     chunk_size=args.chunk_size)
+        mode = 'full'
+        if not args.full and os.path.exists(args.state):
+            saved = ReplenishmentEngine.load(db, args.state, args.chunk_size)
+            if saved.params() == engine.params():
+                engine, mode = saved, 'incremental'
+        computed = engine.run() if mode == 'full' else engine.update()
+        purchases = engine.purchase_list(args.supplier)
+        engine.save(args.state)
+    finally:
+        db.close()
+
+    print(json.dumps({'asOf': engine.as_of, 'mode': mode, 'productsComputed': computed,
+                      'purchaseList': purchases}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+from database import Database
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales and supply reports from the incremental aggregates")
+    parser.add_argument("report", choices=["revenue", "daily-revenue", "top-products", "suppliers", "rebuild"])
+    parser.add_argument("--db", default="warehouse.db")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.report == "revenue":
+            result = dict(db.get_revenue_summary(args.start_date, args.end_date))
+        elif args.report == "daily-revenue":
+            result = [dict(row) for row in db.get_daily_revenue(args.start_date, args.end_date)]
+        elif args.report == "top-products":
+            result = [dict(row) for row in db.get_top_products(args.limit, args.start_date, args.end_date)]
+        elif args.report == "suppliers":
+            result = [dict(row) for row in db.get_supplier_supply(args.start_date, args.end_date)]
+        else:
+            result = db.rebuild_aggregates()
+    finally:
+        db.close()
+
+    print(json.dumps(result, indent=2))
+    if args.report == "rebuild" and any(result.values()):
+        print("⚠️ Aggregates had drifted and were rebuilt.", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
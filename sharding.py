@@ -0,0 +1,122 @@
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from database import Database
+
+# Orders and shipments are merged across warehouses by id, so their ids come from one
+# sequence owned by the lowest-numbered shard instead of each shard's own id_sequences.
+SHARED_SEQUENCES = {
+    'orders': lambda db: db.get_max_order_id(),
+    'shipments': lambda db: db.get_max_shipment_id(),
+}
+
+class ShardedDatabase:
+    def __init__(self, warehouse_ids: Iterable[int], directory: str = ".", pattern: str = "warehouse_{}.db",
+                 readers: int = 2, **options):
+        warehouse_ids = sorted(set(warehouse_ids))
+        if not warehouse_ids:
+            raise ValueError("At least one warehouse is required")
+
+        self.directory = directory
+        self.shards: Dict[int, Database] = {
+            warehouse_id: Database(os.path.join(directory, pattern.format(warehouse_id)),
+                                   pooled=True, readers=readers, **options)
+            for warehouse_id in warehouse_ids
+        }
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="db-shard")
+        self.sequences = self.shards[warehouse_ids[0]]
+        for name, max_id in SHARED_SEQUENCES.items():
+            highest = max(self.fan_out(max_id).values())
+            ids = self.sequences.reserve_ids(name, 1)
+            if ids.start <= highest:
+                self.sequences.reserve_ids(name, highest - ids.start + 1)
+
+    def shard(self, warehouse_id: int) -> Database:
+        db = self.shards.get(warehouse_id)
+        if db is None:
+            raise ValueError(f"Unknown warehouse {warehouse_id}")
+        return db
+
+    def reserve_ids(self, name: str, count: int) -> range:
+        if name in SHARED_SEQUENCES:
+            return self.sequences.reserve_ids(name, count)
+        raise ValueError(f"ID sequence '{name}' is not shared across warehouses")
+
+    def route(self, warehouse_id: int, method: str, *args, **kwargs) -> Any:
+        return getattr(self.shard(warehouse_id), method)(*args, **kwargs)
+
+    def add_product(self, warehouse_id: int, product: Dict[str, Any]):
+        self.shard(warehouse_id).add_product(product)
+
+    def update_product_stock(self, warehouse_id: int, product_id: int, quantity: int):
+        self.shard(warehouse_id).update_product_stock(product_id, quantity)
+
+    def place_order(self, warehouse_id: int, order: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.shard(warehouse_id).place_order(order, items)
+
+    def cancel_order(self, warehouse_id: int, order_id: int, update_memory: bool = False):
+        return self.shard(warehouse_id).cancel_order(order_id, update_memory)
+
+    def add_shipment(self, warehouse_id: int, shipment: Dict[str, Any]):
+        self.shard(warehouse_id).add_shipment(shipment)
+
+    def update_shipment_statuses(self, warehouse_id: int, updates) -> Dict[str, Any]:
+        return self.shard(warehouse_id).update_shipment_statuses(updates)
+
+    def fan_out(self, call: Callable[[Database], Any]) -> Dict[int, Any]:
+        futures = {warehouse_id: self._executor.submit(call, db) for warehouse_id, db in self.shards.items()}
+        return {warehouse_id: future.result() for warehouse_id, future in futures.items()}
+
+    def _merged(self, call: Callable[[Database], List[Any]], sort_key: Callable[[Dict[str, Any]], Any],
+                reverse: bool = False) -> List[Dict[str, Any]]:
+        def tagged(db: Database, warehouse_id: int) -> List[Dict[str, Any]]:
+            rows = [dict(row, warehouseId=warehouse_id) for row in call(db)]
+            rows.sort(key=sort_key, reverse=reverse)
+            return rows
+
+        futures = [self._executor.submit(tagged, db, warehouse_id) for warehouse_id, db in self.shards.items()]
+        return list(heapq.merge(*(future.result() for future in futures), key=sort_key, reverse=reverse))
+
+    def get_all_products(self) -> List[Dict[str, Any]]:
+        return self._merged(lambda db: db.get_all_products(),
+                            lambda row: (row['productId'], row['warehouseId']))
+
+    def get_all_orders(self) -> List[Dict[str, Any]]:
+        return self._merged(lambda db: db.get_all_orders(),
+                            lambda row: (row['orderDate'], row['orderId'], row['warehouseId']), reverse=True)
+
+    def get_all_shipments(self) -> List[Dict[str, Any]]:
+        return self._merged(lambda db: db.get_all_shipments(),
+                            lambda row: (row['shipmentDate'], row['shipmentId'], row['warehouseId']), reverse=True)
+
+    def get_supply_records(self) -> List[Dict[str, Any]]:
+        return self._merged(lambda db: db.get_supply_records(),
+                            lambda row: (row['supplyDate'], row['recordId'], row['warehouseId']), reverse=True)
+
+    def find_orders(self, order_id: int) -> List[Dict[str, Any]]:
+        return [dict(order, warehouseId=warehouse_id)
+                for warehouse_id, order in self.fan_out(lambda db: db.get_order(order_id)).items()
+                if order is not None]
+
+    def get_total_stock(self, product_id: int) -> Dict[str, Any]:
+        by_warehouse = {warehouse_id: product['stockQuantity']
+                        for warehouse_id, product in self.fan_out(lambda db: db.get_product(product_id)).items()
+                        if product is not None}
+        return {'productId': product_id, 'totalStock': sum(by_warehouse.values()), 'byWarehouse': by_warehouse}
+
+    def get_revenue_summary(self, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Dict[str, Any]:
+        summaries = self.fan_out(lambda db: db.get_revenue_summary(start_date, end_date)).values()
+        return {
+            'orderCount': sum(summary['orderCount'] for summary in summaries),
+            'revenue': sum(summary['revenue'] for summary in summaries),
+        }
+
+    def flush(self):
+        self.fan_out(lambda db: db.flush())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for db in self.shards.values():
+            db.close()